@@ -1,39 +1,75 @@
-from flask import Blueprint, jsonify
+from datetime import date, timedelta
+
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Booking, Review, User
+from sqlalchemy.orm import joinedload
+
+from auth import role_required
+from availability import InvalidAvailability, parse_date
+from booking_stats import daily_stats, summarize
+from db_routing import replica_read
+from models import ArtistRating, Booking, Review
+from query_budget import max_queries
+from ratings import EMPTY_RATING
 
 artist_bp = Blueprint('artist', __name__)
 
+DEFAULT_WINDOW_DAYS = 365
+MAX_WINDOW_DAYS = 10 * 366
+UPCOMING_LIMIT = 10
+RECENT_REVIEWS_LIMIT = 10
+
 @artist_bp.route('/artist/dashboard', methods=['GET'])
 @jwt_required()
+@role_required('artist', message='Only artists have a dashboard')
+@max_queries(4)
+@replica_read
 def artist_dashboard():
-    artist_id = get_jwt_identity()
-
-    # Fetch bookings for this artist
-    bookings = Booking.query.filter_by(artist_id=artist_id).all()
-    booking_list = []
-    for b in bookings:
-        organizer = User.query.get(b.organizer_id)
-        booking_list.append({
-            'organizer_name': organizer.username,
-            'organizer_email': organizer.email,
+    """Totals and chart series for ?from=&to= (default: the past and next year), from the daily rollups."""
+    artist_id = int(get_jwt_identity())
+    today = date.today()
+    try:
+        start = parse_date(request.args['from']) if request.args.get('from') else today - timedelta(days=DEFAULT_WINDOW_DAYS)
+        end = parse_date(request.args['to']) if request.args.get('to') else today + timedelta(days=DEFAULT_WINDOW_DAYS)
+    except InvalidAvailability as e:
+        return jsonify({'message': str(e)}), 400
+    if end < start or (end - start).days > MAX_WINDOW_DAYS:
+        return jsonify({'message': f"The window must run forwards and span at most {MAX_WINDOW_DAYS} days"}), 400
+    bucket = request.args.get('bucket') or ('day' if (end - start).days <= 92 else 'month')
+    if bucket not in ('day', 'month'):
+        return jsonify({'message': 'bucket must be day or month'}), 400
+
+    totals, series = summarize(daily_stats(artist_id, start, end), bucket)
+
+    upcoming = Booking.query.options(joinedload(Booking.organizer)).filter(
+        Booking.artist_id == artist_id,
+        Booking.event_date >= today,
+        Booking.status.in_(('requested', 'confirmed')),
+    ).order_by(Booking.event_date, Booking.id).limit(UPCOMING_LIMIT).all()
+
+    rating = ArtistRating.query.get(artist_id)
+
+    reviews = Review.query.options(joinedload(Review.organizer)).filter(
+        Review.artist_id == artist_id
+    ).order_by(Review.id.desc()).limit(RECENT_REVIEWS_LIMIT).all()
+
+    return jsonify({
+        'window': {'from': start.isoformat(), 'to': end.isoformat(), 'bucket': bucket},
+        'totals': totals,
+        'series': series,
+        'bookings': [{
+            'id': b.id,
+            'organizer_name': b.organizer.username if b.organizer else None,
+            'organizer_email': b.organizer.email if b.organizer else None,
             'date': b.event_date.strftime('%Y-%m-%d') if b.event_date else None,
             'status': b.status,
-            'paid': False  # Update later when payment logic added
-        })
-
-    # Fetch reviews for this artist
-    reviews = Review.query.filter_by(artist_id=artist_id).all()
-    review_list = []
-    for r in reviews:
-        organizer = User.query.get(r.organizer_id)
-        review_list.append({
+            'price': b.price,
+            'paid': bool(b.paid),
+        } for b in upcoming],
+        'rating': rating.serialize(histogram=True) if rating else EMPTY_RATING,
+        'reviews': [{
             'rating': r.rating,
             'comment': r.comment,
-            'by': organizer.username
-        })
-
-    return jsonify({
-        'bookings': booking_list,
-        'reviews': review_list
+            'by': r.organizer.username if r.organizer else None,
+        } for r in reviews],
     })
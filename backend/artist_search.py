@@ -0,0 +1,143 @@
+from sqlalchemy import and_, case, func, literal
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import ArtistGenre, ArtistProfile, ArtistRating, Availability, Booking, User, parse_genres
+from ratings import EMPTY_RATING
+
+# (label, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = [
+    ('under_1000', None, 1000),
+    ('1000_5000', 1000, 5000),
+    ('5000_10000', 5000, 10000),
+    ('10000_plus', 10000, None),
+]
+
+SORTS = ('relevance', 'price_asc', 'price_desc', 'top_rated')
+
+
+def price_bucket_expression():
+    whens = []
+    for label, low, high in PRICE_BUCKETS:
+        conditions = []
+        if low is not None:
+            conditions.append(ArtistProfile.price >= low)
+        if high is not None:
+            conditions.append(ArtistProfile.price < high)
+        whens.append((and_(*conditions), label))
+    return case(*whens, else_=None)
+
+
+def _filters(genres, min_price, max_price, available_on):
+    """Return (genre filters, price filters, other filters) so each facet can drop its own."""
+    genre_filters = []
+    if genres:
+        genre_filters.append(ArtistProfile.artist_id.in_(
+            db.select(ArtistGenre.artist_id).where(ArtistGenre.genre.in_(genres))
+        ))
+
+    price_filters = []
+    if min_price is not None:
+        price_filters.append(ArtistProfile.price >= min_price)
+    if max_price is not None:
+        price_filters.append(ArtistProfile.price <= max_price)
+
+    other_filters = []
+    if available_on is not None:
+        # The same rule as booking (date_unavailable): no blocked day and no confirmed booking,
+        # probed per artist through uq_availability_artist_id_date and the confirmed-booking index
+        other_filters.append(~db.select(Availability.id).where(
+            Availability.artist_id == ArtistProfile.artist_id,
+            Availability.date == available_on,
+            Availability.is_available.is_(False)
+        ).exists())
+        other_filters.append(~db.select(Booking.id).where(
+            Booking.artist_id == ArtistProfile.artist_id,
+            Booking.event_date == available_on,
+            Booking.status == 'confirmed'
+        ).exists())
+    return genre_filters, price_filters, other_filters
+
+
+def search_artists(genres=None, min_price=None, max_price=None, available_on=None,
+                   sort='relevance', page=1, limit=20, facets=False):
+    """One page of matching artists; the facet counts are GROUP BYs over every artist, so only on request."""
+    genres = parse_genres(','.join(genres or []))
+    genre_filters, price_filters, other_filters = _filters(genres, min_price, max_price, available_on)
+
+    if genres:
+        matches = (
+            db.select(ArtistGenre.artist_id, func.count().label('matches'))
+            .where(ArtistGenre.genre.in_(genres))
+            .group_by(ArtistGenre.artist_id)
+            .subquery()
+        )
+        relevance = matches.c.matches
+    else:
+        matches = None
+        relevance = literal(0)
+
+    query = ArtistProfile.query.options(joinedload(ArtistProfile.user).joinedload(User.rating))
+    if matches is not None:
+        query = query.join(matches, matches.c.artist_id == ArtistProfile.artist_id)
+    query = query.filter(*price_filters, *other_filters)
+
+    if sort == 'top_rated':
+        query = query.outerjoin(ArtistRating, ArtistRating.artist_id == ArtistProfile.artist_id)
+        order = [ArtistRating.rating_avg.desc().nulls_last(), ArtistRating.rating_count.desc().nulls_last(),
+                 ArtistProfile.artist_id]
+    elif sort == 'price_asc':
+        order = [ArtistProfile.price.asc().nulls_last(), ArtistProfile.artist_id]
+    elif sort == 'price_desc':
+        order = [ArtistProfile.price.desc().nulls_last(), ArtistProfile.artist_id]
+    else:
+        order = [relevance.desc(), ArtistProfile.artist_id]
+
+    total = query.order_by(None).count()
+    profiles = query.add_columns(relevance).order_by(*order).offset((page - 1) * limit).limit(limit).all()
+
+    results = []
+    for profile, score in profiles:
+        user = profile.user
+        results.append({
+            'id': profile.artist_id,
+            'name': user.username if user else "Unknown Artist",
+            'genre': profile.genres,
+            'price': profile.price,
+            'profile_pic_url': user.picture_url('card') if user else None,
+            'rating': user.rating.serialize() if user and user.rating else EMPTY_RATING,
+            'relevance': score,
+        })
+
+    response = {
+        'artists': results,
+        'total': total,
+        'page': page,
+        'limit': limit,
+    }
+    if facets:
+        response['facets'] = _facets(genre_filters, price_filters, other_filters)
+    return response
+
+
+def _facets(genre_filters, price_filters, other_filters):
+    genre_counts = (
+        db.session.query(ArtistGenre.genre, func.count())
+        .join(ArtistProfile, ArtistProfile.artist_id == ArtistGenre.artist_id)
+        .filter(*price_filters, *other_filters)
+        .group_by(ArtistGenre.genre)
+        .all()
+    )
+
+    bucket = price_bucket_expression().label('bucket')
+    price_counts = dict(
+        db.session.query(bucket, func.count())
+        .select_from(ArtistProfile)
+        .filter(ArtistProfile.price.isnot(None), *genre_filters, *other_filters)
+        .group_by(bucket)
+        .all()
+    )
+    return {
+        'genres': {genre: count for genre, count in genre_counts},
+        'price': {label: price_counts.get(label, 0) for label, _, _ in PRICE_BUCKETS},
+    }
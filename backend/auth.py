@@ -0,0 +1,52 @@
+from functools import wraps
+
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from werkzeug.local import LocalProxy
+
+from extensions import db
+from models import User
+
+
+def _load_current_user():
+    # At most one lookup per request, and none unless a view actually touches the user
+    if '_current_user' not in g:
+        g._current_user = db.session.get(User, int(get_jwt_identity()))
+    return g._current_user
+
+
+def init_auth(jwt):
+    @jwt.user_lookup_loader
+    def user_lookup(jwt_header, jwt_data):
+        # flask_jwt_extended calls this for every protected request; hand back a lazy
+        # proxy so `current_user` costs a query only when used. It is falsy if the
+        # user no longer exists.
+        return LocalProxy(_load_current_user)
+
+
+def current_role():
+    """The caller's role from the token, falling back to the row for tokens without it.
+
+    Roles never change after registration, so the claim is as good as the row.
+    """
+    return get_jwt().get('role') or getattr(_load_current_user(), 'role', None)
+
+
+def current_username():
+    return get_jwt().get('username') or getattr(_load_current_user(), 'username', None)
+
+
+def role_required(*roles, message=None, status=403, key='message'):
+    """Reject callers whose role is not in `roles`; use under @jwt_required().
+
+    `status` and `key` let an endpoint keep the response it gave before the
+    check moved here, e.g. {'error': ...} with 404.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if current_role() not in roles:
+                return jsonify({key: message or f"Only {' or '.join(roles)}s can do this"}), status
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+MAX_BULK_DAYS = 731
+DEFAULT_WINDOW_DAYS = 365
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+class InvalidAvailability(ValueError):
+    pass
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise InvalidAvailability(f"Invalid date: {value!r}, expected YYYY-MM-DD")
+
+
+def parse_weekdays(values):
+    weekdays = set()
+    for value in values or []:
+        if isinstance(value, int) and 0 <= value <= 6:
+            weekdays.add(value)
+        elif isinstance(value, str) and value[:3].lower() in WEEKDAYS:
+            weekdays.add(WEEKDAYS.index(value[:3].lower()))
+        else:
+            raise InvalidAvailability(f"Invalid weekday: {value!r}")
+    return weekdays
+
+
+def expand_availability(data):
+    """Flatten `dates` and recurring `ranges` into {date: is_available}.
+
+    Later entries win, so a range can be punched through by a single date:
+        {"ranges": [{"from": "2025-07-01", "to": "2025-09-30", "weekdays": ["fri"],
+                     "is_available": false}],
+         "dates": [{"date": "2025-08-15", "is_available": true}]}
+    """
+    if not isinstance(data, dict):
+        raise InvalidAvailability('Expected a JSON object with dates and/or ranges')
+    days = {}
+    for rule in data.get('ranges') or []:
+        if not isinstance(rule, dict):
+            raise InvalidAvailability(f"Invalid range: {rule!r}")
+        start, end = parse_date(rule.get('from')), parse_date(rule.get('to'))
+        if end < start:
+            raise InvalidAvailability(f"Range ends before it starts: {rule.get('from')}..{rule.get('to')}")
+        if (end - start).days >= MAX_BULK_DAYS:
+            raise InvalidAvailability(f"Ranges may span at most {MAX_BULK_DAYS} days")
+        is_available = rule.get('is_available')
+        if is_available is None:
+            raise InvalidAvailability('Each range needs is_available')
+        weekdays = parse_weekdays(rule.get('weekdays'))
+        day = start
+        while day <= end:
+            if not weekdays or day.weekday() in weekdays:
+                days[day] = bool(is_available)
+            day += timedelta(days=1)
+
+    for entry in data.get('dates') or []:
+        if not isinstance(entry, dict):
+            raise InvalidAvailability(f"Invalid date entry: {entry!r}")
+        if entry.get('is_available') is None:
+            raise InvalidAvailability('Each date needs is_available')
+        days[parse_date(entry.get('date'))] = bool(entry['is_available'])
+
+    if len(days) > MAX_BULK_DAYS:
+        raise InvalidAvailability(f"At most {MAX_BULK_DAYS} days can be set per request")
+    return days
+
+
+def availability_window(start, end, today):
+    """Resolve optional ?from=&to= into a bounded range; a missing end defaults to a year from the other."""
+    start = parse_date(start) if start else None
+    end = parse_date(end) if end else None
+    if start is None:
+        start = end - timedelta(days=DEFAULT_WINDOW_DAYS) if end else today
+    if end is None:
+        end = start + timedelta(days=DEFAULT_WINDOW_DAYS)
+    if end < start or (end - start).days >= MAX_BULK_DAYS:
+        raise InvalidAvailability(f"The window must run forwards and span less than {MAX_BULK_DAYS} days")
+    return start, end
+
+
+def encode_months(rows):
+    """Pack (date, is_available) rows into per-month bitmaps; bit n is day n + 1."""
+    months = {}
+    for day, is_available in rows:
+        month = months.setdefault(day.strftime('%Y-%m'), {'available': 0, 'unavailable': 0})
+        month['available' if is_available else 'unavailable'] |= 1 << (day.day - 1)
+    return months
@@ -0,0 +1,327 @@
+"""Benchmark every endpoint against generated datasets and compare with a stored baseline.
+
+For each dataset size the script loads `generate-data` rows into a SQLite file
+(generated once, then copied for each run) or into an empty Postgres database, serves the app on a
+local threaded server and drives each route with concurrent clients. Per route
+it reports throughput, p50/p95/p99 latency, SQL statements per request and the
+process's peak RSS while the route ran:
+
+    python bench_endpoints.py --sizes 1k,100k --save-baseline bench_baseline.json
+    python bench_endpoints.py --sizes 1k,100k --baseline bench_baseline.json
+    python bench_endpoints.py --sizes 1M --database-url postgresql+psycopg2://localhost/bench
+
+With --baseline it exits non-zero when a route got slower or heavier than the
+threshold allows, or runs more queries per request than before. Streaming
+(/notifications/stream) and upload routes are not driven.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+# Users to generate for roughly this many rows in total (~87 rows per user)
+SIZES = {'1k': 12, '10k': 115, '100k': 1150, '1M': 11500}
+SEED = 42
+
+
+def request(base, method, path, headers=None, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json', **(headers or {})})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else float('nan')
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:  # not Linux; the high-water mark is the best we have
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RssSampler:
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_mb())
+
+
+def scenarios(ids):
+    """(name, method, path, auth, body) per route; path and body may take a request number."""
+    artist = ids['artist_auth']
+    organizer = ids['organizer_auth']
+    artist_id, organizer_id = ids['artist_id'], ids['organizer_id']
+    unique = count()
+    return [
+        ('GET /artists', 'GET', '/artists', None, None),
+        ('GET /artists/search genre+price', 'GET', '/artists/search?genre=jazz&min_price=1000&max_price=20000', None, None),
+        ('GET /artists/search available_on', 'GET', '/artists/search?available_on=2025-06-01&sort=price_asc', None, None),
+        ('GET /search', 'GET', '/search?q=acoustic', None, None),
+        ('GET /api/artists/<id>', 'GET', f'/api/artists/{artist_id}', None, None),
+        ('GET /api/organizers/<id>', 'GET', f'/api/organizers/{organizer_id}', organizer, None),
+        ('GET /announcements', 'GET', '/announcements', None, None),
+        ('GET /announcements/my', 'GET', '/announcements/my', artist, None),
+        ('GET /announcements/artist/<id>', 'GET', f'/announcements/artist/{artist_id}', None, None),
+        ('GET /reviews/artist/<id>', 'GET', f'/reviews/artist/{artist_id}', None, None),
+        ('GET /reviews/organizer/<id>', 'GET', f'/reviews/organizer/{organizer_id}', None, None),
+        ('GET /artist/<id>/availability', 'GET', f'/artist/{artist_id}/availability', None, None),
+        ('GET /artist/<id>/availability bitmap', 'GET',
+         f'/artist/{artist_id}/availability?from=2025-01-01&to=2025-12-31&format=bitmap', None, None),
+        ('GET /artist/bookings', 'GET', '/artist/bookings', artist, None),
+        ('GET /organizer/bookings', 'GET', '/organizer/bookings', organizer, None),
+        ('GET /notifications', 'GET', '/notifications', artist, None),
+        ('GET /notifications/unread_count', 'GET', '/notifications/unread_count', artist, None),
+        ('GET /notifications/poll', 'GET', '/notifications/poll?timeout=0', artist, None),
+        ('GET /home artist', 'GET', '/home', artist, None),
+        ('GET /home organizer', 'GET', '/home', organizer, None),
+        ('GET /artist/dashboard', 'GET', '/artist/dashboard', artist, None),
+        ('GET /export/bookings ndjson', 'GET', '/export/bookings', organizer, None),
+        ('GET /export/notifications csv', 'GET', '/export/notifications?format=csv', artist, None),
+        ('GET /artist/dashboard 5 years', 'GET', '/artist/dashboard?from=2022-01-01&to=2026-12-31', artist, None),
+        ('POST /book', 'POST', '/book', organizer, lambda i: {
+            'artist_id': artist_id, 'event_date': f'2031-01-{i % 28 + 1:02d}', 'price': 1000, 'message': 'bench'}),
+        ('PUT /artist/bookings/<id>/status', 'PUT', f"/artist/bookings/{ids['booking_id']}/status", artist,
+         {'status': 'requested'}),
+        ('PATCH /bookings/<id>/mark_paid', 'PATCH', f"/bookings/{ids['booking_id']}/mark_paid", artist, None),
+        ('POST /artist/availability', 'POST', '/artist/availability', artist,
+         lambda i: {'date': f'2031-02-{i % 28 + 1:02d}', 'is_available': bool(i % 2)}),
+        ('POST /artist/availability/bulk', 'POST', '/artist/availability/bulk', artist,
+         {'ranges': [{'from': '2031-03-01', 'to': '2031-03-31', 'is_available': True}]}),
+        ('POST /artist/profile', 'POST', '/artist/profile', artist,
+         lambda i: {'bio': f'bench bio {i}', 'genres': 'jazz, rock', 'pricing_info': '5000'}),
+        ('POST /announcements', 'POST', '/announcements', artist,
+         lambda i: {'title': f'bench {i}', 'content': 'bench announcement'}),
+        ('POST /notifications/read', 'POST', '/notifications/read', artist, {'ids': [0]}),
+        ('POST /login', 'POST', '/login', None, {'username': ids['artist_username'], 'password': 'password'}),
+        ('POST /register', 'POST', '/register', None, lambda i: {
+            'username': f"bench_{ids['run']}_{next(unique)}", 'email': f"bench_{ids['run']}_{next(unique)}@example.com",
+            'password': 'password', 'role': 'organizer'}),
+    ]
+
+
+def run_scenario(base, scenario, requests, concurrency, query_counts):
+    name, method, path, auth, body = scenario
+    numbers = count()
+    latencies, statuses = [], defaultdict(int)
+    lock = threading.Lock()
+
+    def call(_):
+        i = next(numbers)
+        started = time.perf_counter()
+        status = request(base, method, path(i) if callable(path) else path, auth,
+                         body(i) if callable(body) else body)
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] += 1
+
+    for _ in range(min(5, requests)):  # warm caches and connections, unmeasured
+        request(base, method, path(0) if callable(path) else path, auth, body(0) if callable(body) else body)
+    query_counts.clear()
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(call, range(requests)))
+        elapsed = time.perf_counter() - started
+    queries = sorted(query_counts)
+    return {
+        'rps': requests / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'queries': queries[len(queries) // 2] if queries else 0,
+        'rss_mb': rss.peak,
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def load_dataset(url, size, fresh):
+    """Generate the dataset for `size` at `url` unless it is already there."""
+    import synthetic_data
+    from app import create_app
+    from extensions import db
+    from models import User
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': url, 'RESPONSE_CACHE_BACKEND': 'none'})
+    with app.app_context():
+        if fresh:
+            db.drop_all(bind_key=None)
+        db.create_all(bind_key=None)
+        if not User.query.first():
+            started = time.perf_counter()
+            counts = synthetic_data.generate(users=SIZES[size], seed=SEED)
+            db.session.commit()
+            print(f"loaded {sum(counts.values())} rows for {size} in {time.perf_counter() - started:.1f}s")
+        db.engines[None].dispose()
+
+
+def pick_ids(app):
+    """The busiest artist and organizer, so per-user routes return full pages."""
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import func
+    from extensions import db
+    from models import Booking, User
+
+    def busiest(column):
+        return db.session.query(column).group_by(column).order_by(func.count().desc(), column).limit(1).scalar()
+
+    def auth(user):
+        return {'Authorization': 'Bearer ' + create_access_token(
+            identity=str(user.id), additional_claims={'username': user.username, 'role': user.role})}
+
+    with app.app_context():
+        artist = db.session.get(User, busiest(Booking.artist_id))
+        organizer = db.session.get(User, busiest(Booking.organizer_id))
+        booking_id = db.session.query(Booking.id).filter(
+            Booking.artist_id == artist.id, Booking.status == 'requested'
+        ).order_by(Booking.id).limit(1).scalar()
+        return {
+            'artist_id': artist.id, 'organizer_id': organizer.id, 'booking_id': booking_id,
+            'artist_username': artist.username, 'artist_auth': auth(artist), 'organizer_auth': auth(organizer),
+            'run': os.urandom(4).hex(),
+        }
+
+
+def bench_size(args, size):
+    from flask import g
+    from werkzeug.serving import make_server
+    from app import create_app
+    from extensions import db
+
+    if args.database_url:
+        url = args.database_url
+        load_dataset(url, size, fresh=True)
+    else:
+        # Keep a pristine copy so the writes of one run don't skew the next
+        pristine = os.path.join(args.data_dir, f'bench_{size}_{SEED}.db')
+        load_dataset(f'sqlite:///{pristine}', size, fresh=False)
+        working = os.path.join(args.data_dir, f'bench_{size}_{SEED}.run.db')
+        shutil.copy(pristine, working)
+        url = f'sqlite:///{working}?timeout=60'
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': url,
+        'RESPONSE_CACHE_BACKEND': 'memory' if args.cache else 'none',
+    })
+    ids = pick_ids(app)
+
+    query_counts = []
+
+    @app.after_request
+    def record_queries(response):
+        query_counts.append(g.get('query_count', 0))
+        return response
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no access log per request
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    results = {}
+    print(f"\n{size}: {'route':<38} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>7} {'rss MB':>7}  statuses")
+    for scenario in scenarios(ids):
+        if args.only and args.only not in scenario[0]:
+            continue
+        result = run_scenario(base, scenario, args.requests, args.concurrency, query_counts)
+        results[scenario[0]] = result
+        print(f"{'':<5} {scenario[0]:<38} {result['rps']:8.1f} {result['p50']:7.1f}ms {result['p95']:7.1f}ms "
+              f"{result['p99']:7.1f}ms {result['queries']:7d} {result['rss_mb']:7.1f}  {result['statuses']}")
+    server.shutdown()
+    with app.app_context():
+        db.engines[None].dispose()
+    return results
+
+
+def regressions(results, baseline, threshold, min_ms):
+    found = []
+    for size, routes in results.items():
+        for name, now in routes.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            if now['queries'] > before['queries']:
+                found.append(f"{size} {name}: {before['queries']} -> {now['queries']} queries per request")
+            if now['p95'] > before['p95'] * (1 + threshold) and now['p95'] - before['p95'] > min_ms:
+                found.append(f"{size} {name}: p95 {before['p95']:.1f} -> {now['p95']:.1f}ms")
+            if now['rps'] < before['rps'] * (1 - threshold):
+                found.append(f"{size} {name}: {before['rps']:.1f} -> {now['rps']:.1f} req/s")
+            if now['rss_mb'] > before['rss_mb'] * (1 + threshold):
+                found.append(f"{size} {name}: peak RSS {before['rss_mb']:.0f} -> {now['rss_mb']:.0f} MB")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,100k', help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--only', help='only routes whose name contains this')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--database-url', help='an empty Postgres database; tables are dropped per size')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'stagecraft-bench'),
+                        help='where generated SQLite datasets are kept between runs')
+    parser.add_argument('--baseline', help='compare with this JSON file and fail on regressions')
+    parser.add_argument('--save-baseline', help='write the results to this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative regression')
+    parser.add_argument('--min-ms', type=float, default=2.0, help='ignore p95 regressions smaller than this')
+    args = parser.parse_args()
+
+    sizes = args.sizes.split(',')
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes {unknown}, pick from {list(SIZES)}")
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    results = {size: bench_size(args, size) for size in sizes}
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nsaved baseline to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.threshold, args.min_ms)
+        if found:
+            print('\nFAIL: regressions against ' + args.baseline)
+            for line in found:
+                print('  ' + line)
+            sys.exit(1)
+        print(f"\nOK: no regressions against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Storm /login and measure what it does to everyone else.
+
+Runs the app on a local threaded server over a throwaway SQLite file. While
+`--storm` clients log in as fast as they can, one probe client keeps calling
+GET /artists. For each hasher setting the script reports logins/sec, 503s,
+and the probe's p50/p99:
+
+    python bench_password_hashing.py --seconds 10 --storm 32
+    python bench_password_hashing.py --method pbkdf2:sha256:600000
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(base, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else float('nan')
+
+
+def run_storm(base, seconds, storm, users):
+    deadline = time.perf_counter() + seconds
+    statuses = Counter()
+    lock = threading.Lock()
+    probe_latencies = []
+
+    def login(i):
+        while time.perf_counter() < deadline:
+            status = request(base, 'POST', '/login', users[i % len(users)])
+            with lock:
+                statuses[status] += 1
+
+    def probe():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            request(base, 'GET', '/artists')
+            probe_latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=storm + 1) as pool:
+        pool.submit(probe)
+        for i in range(storm):
+            pool.submit(login, i)
+    return statuses, probe_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--storm', type=int, default=32, help='concurrent login clients')
+    parser.add_argument('--method', default='scrypt:32768:8:1', help='PASSWORD_HASH_METHOD')
+    parser.add_argument('--workers', type=int, default=2, help='PASSWORD_HASH_WORKERS for the bounded run')
+    parser.add_argument('--queue', type=int, default=16, help='PASSWORD_HASH_QUEUE for the bounded run')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}?timeout=60'
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    os.environ['PASSWORD_HASH_METHOD'] = args.method
+
+    from werkzeug.serving import make_server
+    from app import app, db
+    from models import ArtistProfile, User
+    from password_hashing import PasswordHasher
+
+    users = [{'username': f'bench_{i}', 'password': f'secret-{i}'} for i in range(50)]
+    with app.app_context():
+        db.create_all()
+        for credentials in users:
+            user = User(username=credentials['username'], email=f"{credentials['username']}@example.com",
+                        role='artist')
+            user.set_password(credentials['password'])
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(ArtistProfile(artist_id=user.id, bio='bench', genres='jazz', pricing_info='1000'))
+        db.session.commit()
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    request(base, 'GET', '/artists')
+    quiet = []
+    for _ in range(50):
+        started = time.perf_counter()
+        request(base, 'GET', '/artists')
+        quiet.append((time.perf_counter() - started) * 1000)
+    print(f"{'idle':<34} {'':>12} {'':>8}  probe p50 {percentile(quiet, 50):7.1f}ms  "
+          f"p99 {percentile(quiet, 99):7.1f}ms")
+
+    runs = [
+        # A thread per login and no timeout behaves like hashing on the request thread
+        ('unbounded (one hash per request)', args.storm, 0, None),
+        (f'bounded ({args.workers} workers, queue {args.queue})', args.workers, args.queue, 5.0),
+    ]
+    for name, workers, queue_size, timeout in runs:
+        app.extensions['password_hasher'] = PasswordHasher(args.method, workers, queue_size, timeout)
+        statuses, latencies = run_storm(base, args.seconds, args.storm, users)
+        print(f"{name:<34} {statuses.get(200, 0) / args.seconds:7.1f} ok/s {statuses.get(503, 0):>6} 503  "
+              f"probe p50 {percentile(latencies, 50):7.1f}ms  p99 {percentile(latencies, 99):7.1f}ms")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
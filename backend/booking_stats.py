@@ -0,0 +1,125 @@
+from collections import defaultdict
+
+from sqlalchemy import case, delete, event, func, inspect, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import ArtistDailyStats, Booking
+
+STATUSES = ('requested', 'confirmed', 'rejected', 'completed')
+BOOKED_STATUSES = ('confirmed', 'completed')
+COUNTERS = tuple(f'{status}_count' for status in STATUSES) + ('booked_value', 'paid_count', 'paid_value')
+TRACKED = ('artist_id', 'event_date', 'status', 'price', 'paid')
+
+
+def _contribution(artist_id, event_date, status, price, paid):
+    """What one booking adds to its artist's row for its event date."""
+    if artist_id is None or event_date is None:
+        return None, {}
+    counters = {}
+    if status in STATUSES:
+        counters[f'{status}_count'] = 1
+    if status in BOOKED_STATUSES:
+        counters['booked_value'] = price or 0
+    if paid:
+        counters['paid_count'] = 1
+        counters['paid_value'] = price or 0
+    return (int(artist_id), event_date), counters
+
+
+def _committed(state):
+    values = []
+    for attr in TRACKED:
+        history = state.attrs[attr].history
+        old = history.deleted or history.unchanged
+        values.append(old[0] if old else None)
+    return values
+
+
+def _apply(session, deltas):
+    dialect = postgresql if session.get_bind().dialect.name == 'postgresql' else sqlite
+    for (artist_id, day), counters in deltas.items():
+        counters = {name: value for name, value in counters.items() if value}
+        if not counters:
+            continue
+        stmt = dialect.insert(ArtistDailyStats).values(
+            artist_id=artist_id, day=day, **{name: counters.get(name, 0) for name in COUNTERS}
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=['artist_id', 'day'],
+            set_={name: getattr(ArtistDailyStats, name) + value for name, value in counters.items()},
+        ))
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_bookings(session, flush_context):
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    def add(values, sign):
+        key, counters = _contribution(*values)
+        for name, value in counters.items():
+            deltas[key][name] += sign * value
+
+    for obj in session.new:
+        if isinstance(obj, Booking):
+            add([getattr(obj, attr) for attr in TRACKED], 1)
+    for obj in session.dirty:
+        if isinstance(obj, Booking):
+            state = inspect(obj)
+            if any(state.attrs[attr].history.has_changes() for attr in TRACKED):
+                add(_committed(state), -1)
+                add([getattr(obj, attr) for attr in TRACKED], 1)
+    for obj in session.deleted:
+        if isinstance(obj, Booking):
+            add(_committed(inspect(obj)), -1)
+
+    if deltas:
+        _apply(session, deltas)
+
+
+def rebuild_booking_stats(artist_ids=None):
+    """Recompute the daily rollups from the raw bookings with one INSERT ... SELECT."""
+    booked = Booking.status.in_(BOOKED_STATUSES)
+    paid = Booking.paid.is_(True)
+    bookings = db.select(
+        Booking.artist_id,
+        Booking.event_date,
+        *[func.sum(case((Booking.status == status, 1), else_=0)) for status in STATUSES],
+        func.sum(case((booked, func.coalesce(Booking.price, 0)), else_=0)),
+        func.sum(case((paid, 1), else_=0)),
+        func.sum(case((paid, func.coalesce(Booking.price, 0)), else_=0)),
+    ).where(Booking.artist_id.isnot(None), Booking.event_date.isnot(None)).group_by(
+        Booking.artist_id, Booking.event_date
+    )
+
+    clear = delete(ArtistDailyStats)
+    if artist_ids is not None:
+        bookings = bookings.where(Booking.artist_id.in_(artist_ids))
+        clear = clear.where(ArtistDailyStats.artist_id.in_(artist_ids))
+
+    db.session.execute(clear)
+    result = db.session.execute(insert(ArtistDailyStats).from_select(('artist_id', 'day') + COUNTERS, bookings))
+    return result.rowcount
+
+
+def daily_stats(artist_id, start, end):
+    """The artist's rollup rows with `start <= day <= end`; cost follows the window, not the history."""
+    return ArtistDailyStats.query.filter(
+        ArtistDailyStats.artist_id == artist_id,
+        ArtistDailyStats.day.between(start, end),
+    ).order_by(ArtistDailyStats.day).all()
+
+
+def summarize(rows, bucket='day'):
+    """Fold rollup rows into window totals and a chart series bucketed by day or month."""
+    totals = dict.fromkeys(COUNTERS, 0)
+    series = {}
+    for row in rows:
+        label = row.day.isoformat() if bucket == 'day' else row.day.strftime('%Y-%m')
+        point = series.setdefault(label, dict.fromkeys(COUNTERS, 0))
+        for name in COUNTERS:
+            value = getattr(row, name)
+            point[name] += value
+            totals[name] += value
+    return totals, [{'period': label, **point} for label, point in series.items()]
@@ -0,0 +1,43 @@
+import queue
+import threading
+from collections import defaultdict
+
+
+class InProcessBroadcaster:
+    """Fan events out to subscribers in this process.
+
+    Another backend (e.g. Redis pub/sub for multi-worker deployments) only needs
+    the same subscribe/unsubscribe/publish methods.
+    """
+
+    def __init__(self, max_queued=100):
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        subscription = queue.Queue(maxsize=self.max_queued)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                # Slow consumer; it catches up with since_id on reconnect
+                pass
+
+
+broadcaster = InProcessBroadcaster()
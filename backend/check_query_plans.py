@@ -0,0 +1,163 @@
+"""Run every endpoint against a throwaway SQLite database and EXPLAIN the SQL it issues.
+
+Exits non-zero if any query falls back to a full table scan or sorts its rows
+without an index, so a missing or mis-shaped index is caught before it reaches Postgres.
+
+    python check_query_plans.py
+"""
+import os
+import re
+import sys
+from datetime import date, timedelta
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import app, db
+from models import User, ArtistProfile, Availability, Booking, Announcement, Review, Notification
+
+# Endpoints that intentionally return a whole table
+ALLOWED_SCANS = {
+    ('main.get_artists', 'artist_profile'),
+}
+
+# Endpoints that order by a value computed per query (search relevance)
+ALLOWED_SORTS = {
+    'main.search_artist_profiles',
+    'main.search',
+}
+
+ARTIST_ID = 1
+ORGANIZER_ID = 2
+
+
+def seed():
+    artist = User(id=ARTIST_ID, username='plan_artist', email='artist@example.com', role='artist')
+    organizer = User(id=ORGANIZER_ID, username='plan_organizer', email='organizer@example.com', role='organizer')
+    for user in (artist, organizer):
+        user.password_hash = 'x'
+        db.session.add(user)
+    profile = ArtistProfile(artist_id=ARTIST_ID, bio='bio', genres='jazz', pricing_info='1500')
+    profile.sync_search_fields()
+    db.session.add(profile)
+    db.session.add(Announcement(artist_id=ARTIST_ID, title='title', content='content'))
+    for i in range(3):
+        day = date(2025, 1, 1) + timedelta(days=i)
+        booking = Booking(artist_id=ARTIST_ID, organizer_id=ORGANIZER_ID, event_date=day,
+                          status='completed', price=100, message='message')
+        db.session.add(booking)
+        db.session.flush()
+        db.session.add(Review(artist_id=ARTIST_ID, organizer_id=ORGANIZER_ID, booking_id=booking.id, rating=5))
+        db.session.add(Availability(artist_id=ARTIST_ID, date=day, is_available=True))
+        db.session.add(Notification(user_id=ARTIST_ID, content='notification'))
+    db.session.commit()
+
+
+def endpoint_requests():
+    artist_auth = {'Authorization': 'Bearer ' + create_access_token(identity=str(ARTIST_ID))}
+    organizer_auth = {'Authorization': 'Bearer ' + create_access_token(identity=str(ORGANIZER_ID))}
+    return [
+        ('GET', '/artists', None, None),
+        ('GET', '/artists/search?genre=jazz&min_price=1000&available_on=2025-01-01&facets=1', None, None),
+        ('GET', '/artists/search?sort=price_asc', None, None),
+        ('GET', '/search?q=bio', None, None),
+        ('GET', f'/api/artists/{ARTIST_ID}', None, None),
+        ('GET', f'/api/organizers/{ORGANIZER_ID}', organizer_auth, None),
+        ('GET', '/announcements', None, None),
+        ('GET', '/announcements/my', artist_auth, None),
+        ('GET', f'/announcements/artist/{ARTIST_ID}', None, None),
+        ('GET', f'/reviews/artist/{ARTIST_ID}', None, None),
+        ('GET', f'/reviews/organizer/{ORGANIZER_ID}', None, None),
+        ('GET', f'/artist/{ARTIST_ID}/availability', None, None),
+        ('GET', f'/artist/{ARTIST_ID}/availability?from=2025-01-01&to=2025-03-31&format=bitmap', None, None),
+        ('GET', '/artist/bookings', artist_auth, None),
+        ('GET', '/organizer/bookings', organizer_auth, None),
+        ('GET', '/notifications', artist_auth, None),
+        ('GET', '/notifications?since_id=1', artist_auth, None),
+        ('GET', '/notifications/unread_count', artist_auth, None),
+        ('GET', '/home', artist_auth, None),
+        ('GET', '/artist/dashboard', artist_auth, None),
+        ('GET', '/artist/dashboard?from=2020-01-01&to=2029-12-31', artist_auth, None),
+        ('GET', '/export/bookings', artist_auth, None),
+        ('GET', '/export/bookings?format=csv', organizer_auth, None),
+        ('GET', '/export/reviews', artist_auth, None),
+        ('GET', '/export/notifications', artist_auth, None),
+        ('GET', '/home', organizer_auth, None),
+        ('POST', '/artist/availability', artist_auth, {'date': '2025-01-01', 'is_available': False}),
+        ('POST', '/book', organizer_auth, {'artist_id': ARTIST_ID, 'event_date': '2025-02-01',
+                                          'price': 100, 'message': 'message'}),
+    ]
+
+
+def table_name(name):
+    # Eager loads alias joined tables as e.g. user_1
+    if name not in db.metadata.tables:
+        name = re.sub(r'_\d+$', '', name)
+    return name
+
+
+def plan_problems(connection, endpoint, statement, parameters):
+    problems = []
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            if endpoint not in ALLOWED_SORTS:
+                problems.append(detail)
+            continue
+        if not detail.startswith('SCAN '):
+            continue
+        words = detail.split()
+        table = table_name(words[1])
+        if table not in db.metadata.tables or 'USING' in words:
+            continue
+        if (endpoint, table) in ALLOWED_SCANS:
+            continue
+        problems.append(detail)
+    return problems
+
+
+def main():
+    app.config['TESTING'] = True
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            captured.append((statement, parameters))
+
+    failures = []
+    with app.app_context():
+        db.create_all()
+        seed()
+        client = app.test_client()
+        engine = db.engine
+        for method, url, headers, body in endpoint_requests():
+            captured.clear()
+            event.listen(engine, 'before_cursor_execute', capture)
+            try:
+                response = client.open(url, method=method, headers=headers, json=body)
+                response.get_data()  # streamed bodies run their queries only when read
+                response.close()
+            finally:
+                event.remove(engine, 'before_cursor_execute', capture)
+            endpoint = app.url_map.bind('').match(url.split('?')[0], method=method)[0]
+            if response.status_code >= 400:
+                failures.append(f"{method} {url}: HTTP {response.status_code}")
+                continue
+            with engine.connect() as connection:
+                for statement, parameters in captured:
+                    for problem in plan_problems(connection, endpoint, statement, parameters):
+                        failures.append(f"{method} {url}: {problem}\n    {' '.join(statement.split())}")
+            print(f"ok  {method} {url} ({len(captured)} queries)")
+
+    if failures:
+        print('\nQuery plan regressions:')
+        for failure in failures:
+            print('  ' + failure)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Check read-replica routing with two SQLite files standing in for primary and replica.
+
+The replica is a copy of the primary taken before a write, i.e. a replica that
+has not caught up. Read-only endpoints must serve the stale copy to everyone
+except the user who just wrote, who reads from the primary until the sticky
+window runs out.
+
+It runs again with the response cache on, where the miss that follows an
+invalidation must read the primary, or the stale replica rows would be cached
+under the new version for everyone:
+
+    python check_replica_routing.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+
+def check(cache_backend):
+    root = tempfile.mkdtemp()
+    primary_path = os.path.join(root, 'primary.db')
+    replica_path = os.path.join(root, 'replica.db')
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app, db
+    from db_routing import REPLICA_BIND
+    from models import ArtistProfile, User
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary_path}',
+        'SQLALCHEMY_BINDS': {REPLICA_BIND: f'sqlite:///{replica_path}'},
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'RESPONSE_CACHE_BACKEND': cache_backend,
+        'REPLICA_STICKY_SECONDS': 1,
+    })
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        artist = User(username='replica_artist', email='replica_artist@example.com', role='artist',
+                      password_hash='x')
+        db.session.add(artist)
+        db.session.flush()
+        db.session.add(ArtistProfile(artist_id=artist.id, bio='old bio', genres='jazz', pricing_info='1000'))
+        db.session.commit()
+        artist_id = artist.id
+        artist_auth = {'Authorization': 'Bearer ' + create_access_token(
+            identity=str(artist_id), additional_claims={'role': 'artist', 'username': artist.username}
+        )}
+        db.engines[None].dispose()
+    shutil.copy(primary_path, replica_path)
+
+    client = app.test_client()
+    failures = []
+
+    def bio(headers=None):
+        return client.get(f'/api/artists/{artist_id}', headers=headers or {}).json['artist']['bio']
+
+    def expect(label, actual, expected):
+        status = 'ok ' if actual == expected else 'FAIL'
+        print(f"{status} {label}: {actual!r}")
+        if actual != expected:
+            failures.append(label)
+
+    print(f"-- response cache: {cache_backend}")
+    expect('anonymous read before the write', bio(), 'old bio')
+    client.post('/artist/profile', headers=artist_auth, json={'bio': 'new bio', 'genres': 'jazz'})
+    if cache_backend == 'none':
+        expect('anonymous read after the write (replica lagging)', bio(), 'old bio')
+        expect('writer reads their own write (sticky to primary)', bio(artist_auth), 'new bio')
+        time.sleep(1.1)
+        expect('writer after the sticky window (back on replica)', bio(artist_auth), 'old bio')
+    else:
+        expect('anonymous miss after the write (refilled from primary)', bio(), 'new bio')
+        expect('writer reads their own write (cached)', bio(artist_auth), 'new bio')
+        time.sleep(1.1)
+        expect('writer after the sticky window (still cached)', bio(artist_auth), 'new bio')
+    with app.app_context():
+        expect('primary has the write', db.session.get(ArtistProfile, artist_id).bio, 'new bio')
+    return failures
+
+
+def main():
+    failures = check('none') + check('memory')
+    if failures:
+        sys.exit(1)
+    print('OK: reads follow the replica, writers read their own writes, the cache is never refilled stale')
+
+
+if __name__ == '__main__':
+    main()
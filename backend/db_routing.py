@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import CompoundSelect, Select
+
+REPLICA_BIND = 'replica'
+WROTE_KEY = 'session_wrote'
+
+
+def engine_options_from_env():
+    """SQLALCHEMY_ENGINE_OPTIONS for every bind, tunable per deployment.
+
+    pool_size/max_overflow/pool_timeout are only passed when set, since SQLite's
+    in-memory pool rejects them.
+    """
+    options = {
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1',
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    }
+    for option, variable in (('pool_size', 'DB_POOL_SIZE'),
+                             ('max_overflow', 'DB_MAX_OVERFLOW'),
+                             ('pool_timeout', 'DB_POOL_TIMEOUT')):
+        if variable in os.environ:
+            options[option] = int(os.environ[variable])
+    return options
+
+
+class StickyWrites:
+    """Remembers who wrote recently so their reads stay on the primary until the replica catches up.
+
+    Per process, like the broadcaster; a user whose next request lands on another
+    worker may read from the replica within the window.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._lock = threading.Lock()
+        self._until = {}
+
+    def touch(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            self._until[str(user_id)] = now + self.seconds
+            if len(self._until) > 10000:
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+    def is_sticky(self, user_id):
+        with self._lock:
+            return self._until.get(str(user_id), 0) > time.monotonic()
+
+
+class RoutingSession(FlaskSession):
+    """Sends SELECTs from replica_read views to the replica bind; everything else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and isinstance(clause, (Select, CompoundSelect))
+                and has_request_context() and g.get('read_replica')):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _caller_identity():
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:  # a bad token on a public endpoint just means anonymous
+        return None
+
+
+def replica_read(view):
+    """Serve a read-only view from the replica, unless the caller wrote moments ago.
+
+    An outer decorator can set g.read_primary to keep the view on the primary;
+    @cached does so when it refills an entry that was just invalidated.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        sticky = current_app.extensions['sticky_writes']
+        identity = _caller_identity()
+        g.read_replica = not (g.get('read_primary') or identity is not None and sticky.is_sticky(identity))
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_replica_routing(app):
+    app.config.setdefault('REPLICA_STICKY_SECONDS', 5)
+    app.extensions['sticky_writes'] = StickyWrites(app.config['REPLICA_STICKY_SECONDS'])
+
+
+@event.listens_for(Session, 'after_flush')
+def _flushed(session, flush_context):
+    session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _remember_writer(session):
+    if session.info.pop(WROTE_KEY, False) and has_request_context():
+        sticky = current_app.extensions.get('sticky_writes')
+        identity = _caller_identity()
+        if sticky is not None and identity is not None:
+            sticky.touch(identity)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_writes(session):
+    session.info.pop(WROTE_KEY, None)
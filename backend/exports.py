@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from flask import Response, stream_with_context
+
+from extensions import db
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_BATCH_SIZE = 1000
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _ndjson(columns, batch):
+    return ''.join(json.dumps(dict(zip(columns, map(_plain, row)))) + '\n' for row in batch)
+
+
+def _csv(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def stream_export(stmt, filename, fmt):
+    """Stream the rows of a Core select as NDJSON or CSV, EXPORT_BATCH_SIZE rows at a time.
+
+    The header goes out before the query runs, and rows come from a server-side
+    cursor (yield_per), so memory stays flat however many rows there are. The
+    connection is held until the last row is sent.
+    """
+    columns = [column.name for column in stmt.selected_columns]
+
+    def generate():
+        if fmt == 'csv':
+            yield _csv([columns])
+        result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            yield _csv(batch) if fmt == 'csv' else _ndjson(columns, batch)
+        # Release the connection now rather than when the request context ends
+        db.session.remove()
+
+    return Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{filename}.{fmt}"',
+        'X-Accel-Buffering': 'no',  # let nginx pass batches through as they are produced
+    })
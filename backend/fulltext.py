@@ -0,0 +1,187 @@
+import html
+import re
+
+from sqlalchemy import DDL, column, event, func, insert, literal, literal_column, null, table, text, union_all
+
+from extensions import db
+from models import User, ArtistProfile, Announcement, Review
+
+# kind -> (model, id column, artist id column, searchable columns)
+SOURCES = {
+    'artist': (ArtistProfile, 'artist_id', 'artist_id', ('bio',)),
+    'user': (User, 'id', None, ('bio',)),
+    'announcement': (Announcement, 'id', 'artist_id', ('title', 'content')),
+    'review': (Review, 'id', 'artist_id', ('comment',)),
+}
+
+# Rendered inline rather than bound so Postgres matches the GIN index expressions
+TS_CONFIG = literal_column("'english'::regconfig")
+SEPARATOR = literal_column("' '")
+
+# The databases mark matches with private-use characters; the text is escaped before they become tags
+SNIPPET_START = '\ue000'
+SNIPPET_STOP = '\ue001'
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+# Postgres' english stopword list. Postgres drops these from a query while FTS5 matches them,
+# so they are dropped here for both.
+STOPWORDS = frozenset('''
+    i me my myself we our ours ourselves you your yours yourself yourselves he him his himself she
+    her hers herself it its itself they them their theirs themselves what which who whom this that
+    these those am is are was were be been being have has had having do does did doing a an the and
+    but if or because as until while of at by for with about against between into through during
+    before after above below to from up down in out on off over under again further then once here
+    there when where why how all any both each few more most other some such no nor not only own
+    same so than too very s t can will just don should now
+'''.split())
+
+
+def search_terms(q):
+    return [term for term in re.findall(r'\w+', (q or '').lower()) if term not in STOPWORDS][:10]
+
+
+def highlight(snippet):
+    """HTML-escape a snippet, then turn the match markers into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_START, HIGHLIGHT_START).replace(SNIPPET_STOP, HIGHLIGHT_STOP)
+
+
+def document_text(target, columns):
+    return ' '.join(getattr(target, c) or '' for c in columns)
+
+
+def document_expression(model, columns):
+    # Must match the expression of the GIN indexes in the migration exactly
+    expression = func.coalesce(getattr(model, columns[0]), '')
+    for column in columns[1:]:
+        expression = expression.op('||')(SEPARATOR).op('||')(func.coalesce(getattr(model, column), ''))
+    return expression
+
+
+# ----------------- SQLite (FTS5) -----------------
+event.listen(
+    db.metadata, 'after_create',
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, artist_id UNINDEXED, body, tokenize='porter unicode61')"
+    ).execute_if(dialect='sqlite')
+)
+event.listen(
+    db.metadata, 'before_drop',
+    DDL("DROP TABLE IF EXISTS search_fts").execute_if(dialect='sqlite')
+)
+
+
+SEARCH_FTS = table('search_fts', column('kind'), column('ref_id'), column('artist_id'), column('body'))
+
+
+def _register_sqlite_sync(kind, model, id_column, artist_column, columns):
+    # Postgres keeps its GIN indexes current by itself; SQLite needs the FTS rows written
+    def remove(connection, target):
+        connection.execute(
+            text("DELETE FROM search_fts WHERE kind = :kind AND ref_id = :ref_id"),
+            {'kind': kind, 'ref_id': int(getattr(target, id_column))}
+        )
+
+    def upsert(mapper, connection, target):
+        if connection.dialect.name != 'sqlite':
+            return
+        remove(connection, target)
+        body = document_text(target, columns)
+        if body.strip():
+            connection.execute(
+                text("INSERT INTO search_fts (kind, ref_id, artist_id, body) "
+                     "VALUES (:kind, :ref_id, :artist_id, :body)"),
+                {'kind': kind, 'ref_id': int(getattr(target, id_column)),
+                 'artist_id': int(getattr(target, artist_column)) if artist_column else None,
+                 'body': body}
+            )
+
+    def delete(mapper, connection, target):
+        if connection.dialect.name == 'sqlite':
+            remove(connection, target)
+
+    event.listen(model, 'after_insert', upsert)
+    event.listen(model, 'after_update', upsert)
+    event.listen(model, 'after_delete', delete)
+
+
+for _kind, (_model, _id, _artist, _columns) in SOURCES.items():
+    _register_sqlite_sync(_kind, _model, _id, _artist, _columns)
+
+
+def rebuild_index():
+    """Refill search_fts from the source tables, for rows written without the ORM (bulk loads)."""
+    if db.session.get_bind().dialect.name != 'sqlite':
+        return
+    db.session.execute(text("DELETE FROM search_fts"))
+    for kind, (model, id_column, artist_column, columns) in SOURCES.items():
+        document = document_expression(model, columns)
+        db.session.execute(
+            insert(SEARCH_FTS).from_select(
+                ['kind', 'ref_id', 'artist_id', 'body'],
+                db.select(
+                    literal(kind),
+                    getattr(model, id_column),
+                    getattr(model, artist_column) if artist_column else null(),
+                    document,
+                ).where(func.trim(document) != '')
+            )
+        )
+
+
+def _search_sqlite(terms, limit):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    rows = db.session.execute(
+        text(
+            "SELECT kind, ref_id, artist_id, -bm25(search_fts) AS score, "
+            "snippet(search_fts, 3, :start, :stop, '…', 12) AS snippet "
+            "FROM search_fts WHERE search_fts MATCH :match ORDER BY bm25(search_fts) LIMIT :limit"
+        ),
+        {'match': match, 'start': SNIPPET_START, 'stop': SNIPPET_STOP, 'limit': limit}
+    )
+    return rows.fetchall()
+
+
+# ----------------- Postgres (tsvector / GIN) -----------------
+def _search_postgres(terms, limit):
+    query = func.to_tsquery(TS_CONFIG, ' & '.join(f'{term}:*' for term in terms))
+    headline_options = f'StartSel={SNIPPET_START},StopSel={SNIPPET_STOP},MaxWords=24,MinWords=8'
+
+    selects = []
+    for kind, (model, id_column, artist_column, columns) in SOURCES.items():
+        document = document_expression(model, columns)
+        vector = func.to_tsvector(TS_CONFIG, document)
+        selects.append(
+            db.select(
+                literal(kind).label('kind'),
+                getattr(model, id_column).label('ref_id'),
+                (getattr(model, artist_column) if artist_column else null()).label('artist_id'),
+                func.ts_rank(vector, query).label('score'),
+                func.ts_headline(TS_CONFIG, document, query, headline_options).label('snippet'),
+            ).where(vector.op('@@')(query))
+        )
+
+    matches = union_all(*selects).subquery('matches')
+    return db.session.execute(
+        db.select(matches).order_by(matches.c.score.desc()).limit(limit)
+    ).fetchall()
+
+
+def search(q, limit=20):
+    terms = search_terms(q)
+    if not terms:
+        return []
+    if db.session.get_bind().dialect.name == 'postgresql':
+        rows = _search_postgres(terms, limit)
+    else:
+        rows = _search_sqlite(terms, limit)
+    return [{
+        'kind': row.kind,
+        'id': row.ref_id,
+        'artist_id': row.artist_id,
+        'score': round(float(row.score), 4),
+        'snippet': highlight(row.snippet),
+    } for row in rows]
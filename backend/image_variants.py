@@ -0,0 +1,114 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from extensions import db
+from media_storage import VARIANT_PATTERN, blob_path, blob_url
+from models import MediaBlob, User
+from response_cache import invalidate_on_commit
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # renditions are skipped and the original is served
+    Image = None
+
+log = logging.getLogger(__name__)
+
+PENDING_KEY = 'pending_image_variants'
+
+# name -> longest edge in pixels
+VARIANTS = {
+    'thumb': 96,
+    'card': 400,
+    'full': 1600,
+}
+JPEG_QUALITY = 82
+
+
+def variant_path(original_path, variant):
+    return VARIANT_PATTERN.format(original_path.rsplit('.', 1)[0], variant)
+
+
+def render_variants(path):
+    """Write every rendition of the image at `path` as a progressive, metadata-free JPEG."""
+    with Image.open(path) as image:
+        image.draft('RGB', (max(VARIANTS.values()),) * 2)  # cheap DCT downscale for big JPEGs
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+
+        for variant, edge in sorted(VARIANTS.items(), key=lambda item: -item[1]):
+            image.thumbnail((edge, edge), Image.LANCZOS)
+            tmp_path = variant_path(path, variant) + '.part'
+            # No exif= argument, so EXIF (GPS, camera serials) is dropped
+            image.save(tmp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+            os.replace(tmp_path, variant_path(path, variant))
+
+
+def process_blob(digest):
+    blob = db.session.get(MediaBlob, digest)
+    if blob is None or blob.variants_ready:
+        return
+    render_variants(blob_path(blob.digest, blob.ext))
+    db.session.execute(
+        update(MediaBlob).where(MediaBlob.digest == digest).values(variants_ready=True)
+    )
+    user_ids = db.session.execute(
+        update(User)
+        .where(User.profile_pic == blob_url(blob.digest, blob.ext))
+        .values(profile_pic_variants=True)
+        .returning(User.id)
+    ).scalars().all()
+    invalidate_on_commit('artists', *[f'artist:{user_id}' for user_id in user_ids])
+    db.session.commit()
+
+
+def _run(app, digest):
+    with app.app_context():
+        try:
+            process_blob(digest)
+        except Exception:
+            log.exception("Rendering variants for %s failed", digest)
+            db.session.rollback()
+
+
+def init_image_variants(app):
+    app.config.setdefault('IMAGE_VARIANT_WORKERS', 2)
+    workers = app.config['IMAGE_VARIANT_WORKERS']
+    if Image is not None and workers:
+        app.extensions['image_variants'] = ThreadPoolExecutor(workers, thread_name_prefix='image-variants')
+
+
+def queue_variants(digest):
+    """Render the blob's variants once the current transaction commits."""
+    if Image is not None:
+        db.session.info.setdefault(PENDING_KEY, set()).add(digest)
+
+
+@event.listens_for(Session, 'after_commit')
+def _submit_pending_variants(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending or not has_app_context():
+        return
+    app = current_app._get_current_object()
+    executor = app.extensions.get('image_variants')
+    for digest in pending:
+        if executor is None:
+            # IMAGE_VARIANT_WORKERS = 0 renders inline, after the response data is committed
+            _run(app, digest)
+        else:
+            executor.submit(_run, app, digest)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_variants(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,252 @@
+import heapq
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from extensions import db
+
+log = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+SLOWEST_KEPT = 3  # statements quoted in a slow-request log line
+STATEMENT_LOG_LIMIT = 2000
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Metrics:
+    """In-process counters and histograms rendered in the Prometheus text format.
+
+    Per process, like the broadcaster; with several workers, scrape each one or
+    sum them in Prometheus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}  # (method, route, status) -> Histogram
+        self.sql_statements = {}  # route -> count
+        self.sql_seconds = {}  # route -> seconds
+        self.slow_requests = {}  # route -> count
+        self.checkout_wait = {}  # bind -> Histogram
+
+    def observe_request(self, method, route, status, seconds, statements, sql_seconds, slow):
+        with self._lock:
+            key = (method, route, str(status))
+            self.requests.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.sql_statements[route] = self.sql_statements.get(route, 0) + statements
+            self.sql_seconds[route] = self.sql_seconds.get(route, 0.0) + sql_seconds
+            if slow:
+                self.slow_requests[route] = self.slow_requests.get(route, 0) + 1
+
+    def observe_checkout(self, bind, seconds):
+        with self._lock:
+            self.checkout_wait.setdefault(bind, Histogram(CHECKOUT_BUCKETS)).observe(seconds)
+
+    def render(self, engines):
+        lines = []
+
+        def histogram(name, help_text, series):
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} histogram'])
+            for labels, hist in series:
+                cumulative = 0
+                for bound, bucket_count in zip(hist.buckets + (float('inf'),), hist.counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{_labels(labels, le=le)} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {hist.sum}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+
+        def simple(name, kind, help_text, series):
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} {kind}'])
+            for labels, value in series:
+                lines.append(f'{name}{_labels(labels)} {value}')
+
+        with self._lock:
+            histogram('stagecraft_http_request_duration_seconds', 'Time from request start to response.', [
+                ({'method': m, 'route': r, 'status': s}, h) for (m, r, s), h in sorted(self.requests.items())
+            ])
+            simple('stagecraft_sql_statements_total', 'counter', 'SQL statements run by requests.',
+                   [({'route': r}, v) for r, v in sorted(self.sql_statements.items())])
+            simple('stagecraft_sql_duration_seconds_total', 'counter', 'Time requests spent executing SQL.',
+                   [({'route': r}, v) for r, v in sorted(self.sql_seconds.items())])
+            simple('stagecraft_slow_requests_total', 'counter', 'Requests slower than SLOW_REQUEST_MS.',
+                   [({'route': r}, v) for r, v in sorted(self.slow_requests.items())])
+            histogram('stagecraft_db_pool_checkout_wait_seconds',
+                      'Wait for a pooled connection (including pre-ping) before a transaction\'s first statement.',
+                      [({'bind': b}, h) for b, h in sorted(self.checkout_wait.items())])
+
+        pools = [(bind or 'default', engine.pool) for bind, engine in engines.items()]
+        for name, method, help_text in (
+            ('stagecraft_db_pool_size', 'size', 'Configured pool size.'),
+            ('stagecraft_db_pool_checked_out', 'checkedout', 'Connections currently checked out.'),
+            ('stagecraft_db_pool_overflow', 'overflow', 'Connections open beyond the pool size.'),
+        ):
+            simple(name, 'gauge', help_text, [
+                ({'bind': bind}, getattr(pool, method)()) for bind, pool in pools if hasattr(pool, method)
+            ])
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Adds the time spent encoding response bodies to the request's `serialize` timing."""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            if has_request_context():
+                g.serialize_time = g.get('serialize_time', 0.0) + time.perf_counter() - started
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('statement_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['statement_started'].pop()
+    if not has_request_context():
+        return
+    g.sql_time = g.get('sql_time', 0.0) + elapsed
+    slowest = g.setdefault('slowest_statements', [])
+    entry = (elapsed, statement[:STATEMENT_LOG_LIMIT])
+    if len(slowest) < SLOWEST_KEPT:
+        heapq.heappush(slowest, entry)
+    elif elapsed > slowest[0][0]:
+        heapq.heapreplace(slowest, entry)
+    if elapsed * 1000 >= current_app.config['SLOW_QUERY_MS']:
+        log.warning(json.dumps({
+            'event': 'slow_query',
+            'method': request.method,
+            'route': _route(),
+            'duration_ms': round(elapsed * 1000, 1),
+            'statement': statement[:STATEMENT_LOG_LIMIT],
+            'rows': len(parameters) if executemany else 1,
+            'parameter_types': _parameter_types(parameters, executemany),
+        }))
+
+
+@event.listens_for(Engine, 'handle_error')
+def _abandon_statement(context):
+    # A failed statement never reaches after_cursor_execute; drop its timer so the next one pairs up
+    started = context.connection.info.get('statement_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _parameter_types(parameters, executemany):
+    """Type names of the bind values; the values themselves (emails, hashes, messages) stay out of logs."""
+    row = parameters[0] if executemany and parameters else parameters
+    values = row.values() if isinstance(row, dict) else (row or ())
+    return [type(value).__name__ for value in values]
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _before_execute(orm_execute_state):
+    # A transaction's connection is checked out lazily by its first statement
+    orm_execute_state.session.info['execute_started'] = time.perf_counter()
+
+
+@event.listens_for(Session, 'after_begin')
+def _connection_acquired(session, transaction, connection):
+    started = session.info.pop('execute_started', None)
+    if started is None or not has_app_context():
+        return
+    metrics = current_app.extensions.get('metrics')
+    if metrics is not None:
+        bind = next((key for key, engine in db.engines.items() if engine is connection.engine), None)
+        metrics.observe_checkout(bind or 'default', time.perf_counter() - started)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _forget_execute(session, transaction):
+    # A later transaction begun by a flush must not be timed from this stamp
+    session.info.pop('execute_started', None)
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def init_instrumentation(app):
+    app.config.setdefault('SERVER_TIMING', True)
+    app.config.setdefault('SLOW_REQUEST_MS', 500)
+    app.config.setdefault('SLOW_QUERY_MS', 100)
+    app.config.setdefault('METRICS_TOKEN', None)
+    app.json = TimedJSONProvider(app)
+    app.extensions['metrics'] = Metrics()
+
+    @app.before_request
+    def start_timing():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_timing(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        sql_time = g.get('sql_time', 0.0)
+        serialize_time = g.get('serialize_time', 0.0)
+        statements = g.get('query_count', 0)
+        slow = total * 1000 >= app.config['SLOW_REQUEST_MS']
+
+        if app.config['SERVER_TIMING']:
+            response.headers['Server-Timing'] = ', '.join([
+                f'db;dur={sql_time * 1000:.1f};desc="{statements} statements"',
+                f'serialize;dur={serialize_time * 1000:.1f}',
+                f'app;dur={max(total - sql_time - serialize_time, 0) * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+        if slow:
+            log.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'route': _route(),
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(total * 1000, 1),
+                'sql_ms': round(sql_time * 1000, 1),
+                'sql_statements': statements,
+                'serialize_ms': round(serialize_time * 1000, 1),
+                'slowest_statements': [
+                    {'duration_ms': round(elapsed * 1000, 1), 'statement': statement}
+                    for elapsed, statement in sorted(g.get('slowest_statements', []), reverse=True)
+                ],
+            }))
+        app.extensions['metrics'].observe_request(
+            request.method, _route(), response.status_code, total, statements, sql_time, slow
+        )
+        return response
+
+
+def render_metrics():
+    return current_app.extensions['metrics'].render(db.engines)
@@ -0,0 +1,98 @@
+"""Fire hundreds of parallel bookings and confirmations at a single artist/date.
+
+Proves that exactly one confirmation wins and reports throughput per phase.
+Runs against a throwaway SQLite file unless a database URL is given:
+
+    python loadtest_booking.py --requests 300 --workers 32
+    python loadtest_booking.py --database-url postgresql+psycopg2://...
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_phase(app, name, calls, workers):
+    def call(request):
+        method, url, headers, body = request
+        return app.test_client().open(url, method=method, headers=headers, json=body).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = Counter(pool.map(call, calls))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {len(calls):>5} requests  {elapsed:7.2f}s  "
+          f"{len(calls) / elapsed:8.1f} req/s  statuses={dict(sorted(statuses.items()))}")
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--database-url')
+    parser.add_argument('--event-date', default='2030-06-14')
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), 'loadtest.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}?timeout=60'
+
+    from flask_jwt_extended import create_access_token
+    from app import app, db
+    from models import Booking, User
+
+    run = uuid.uuid4().hex[:8]
+    with app.app_context():
+        db.create_all()
+        artist = User(username=f'load_artist_{run}', email=f'artist_{run}@example.com',
+                      role='artist', password_hash='x')
+        organizers = [
+            User(username=f'load_org_{run}_{i}', email=f'org_{run}_{i}@example.com',
+                 role='organizer', password_hash='x')
+            for i in range(args.requests)
+        ]
+        db.session.add_all([artist] + organizers)
+        db.session.commit()
+        artist_id = artist.id
+        artist_auth = {'Authorization': 'Bearer ' + create_access_token(identity=str(artist_id))}
+        organizer_auth = [
+            {'Authorization': 'Bearer ' + create_access_token(identity=str(o.id))}
+            for o in organizers
+        ]
+
+    booking = {'artist_id': artist_id, 'event_date': args.event_date, 'price': 1000, 'message': 'load test'}
+    run_phase(app, 'book (requested)', [
+        ('POST', '/book', auth, booking) for auth in organizer_auth
+    ], args.workers)
+
+    with app.app_context():
+        booking_ids = [b.id for b in Booking.query.filter_by(artist_id=artist_id).all()]
+
+    statuses = run_phase(app, 'confirm (racing)', [
+        ('PUT', f'/artist/bookings/{booking_id}/status', artist_auth, {'status': 'confirmed'})
+        for booking_id in booking_ids
+    ], args.workers)
+
+    late = run_phase(app, 'book after confirmation', [
+        ('POST', '/book', auth, booking) for auth in organizer_auth
+    ], args.workers)
+
+    with app.app_context():
+        confirmed = Booking.query.filter_by(artist_id=artist_id, status='confirmed').count()
+
+    print(f"\nconfirmed bookings for the slot: {confirmed}")
+    if confirmed != 1 or statuses.get(200) != 1 or set(late) != {409}:
+        print('FAIL: the slot was not admitted exactly once')
+        sys.exit(1)
+    print('OK: exactly one confirmation won')
+
+
+if __name__ == '__main__':
+    main()
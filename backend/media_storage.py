@@ -0,0 +1,278 @@
+import glob
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, request, send_from_directory
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import MediaBlob, User
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_SIZE = 16
+
+MAGIC_NUMBERS = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+MEDIA_URL_PREFIX = '/static/media/'
+MEDIA_URL_PATTERN = re.compile(r'^/static/media/[0-9a-f]{2}/([0-9a-f]{64})\.(\w+)$')
+
+# Relative path under the media root: <aa>/<digest>.<ext> or <aa>/<digest>_<variant>.jpg
+MEDIA_FILE_PATTERN = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{64}(_\w+)?\.\w+$')
+
+# Every media URL names its content, so a response can be cached forever
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Content-Encoding -> suffix of a precompressed sibling file
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+# Renditions of a blob sit next to it as <digest>_<variant>.jpg; see image_variants.py
+VARIANT_PATTERN = '{}_{}.jpg'
+
+# Blobs younger than this are never collected, so an upload whose row is not yet committed survives
+GC_GRACE_PERIOD = timedelta(hours=1)
+
+
+def media_root():
+    return current_app.config.get('MEDIA_ROOT') or os.path.join(current_app.root_path, 'static', 'media')
+
+
+def send_media(filename):
+    """Serve a stored media file with Range, conditional and far-future caching support.
+
+    Returns None for names that are not media files.
+    """
+    if not MEDIA_FILE_PATTERN.match(filename):
+        return None
+    root = media_root()
+    mimetype = mimetypes.guess_type(filename)[0]
+
+    served, encoding = filename, None
+    for candidate, suffix in PRECOMPRESSED:
+        if candidate in request.accept_encodings and os.path.exists(os.path.join(root, filename + suffix)):
+            served, encoding = filename + suffix, candidate
+            break
+
+    accel_prefix = current_app.config.get('MEDIA_ACCEL_REDIRECT')
+    if accel_prefix:
+        # nginx streams the file from its internal location, including Range and validators
+        if not os.path.exists(os.path.join(root, served)):
+            return None
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + served
+    else:
+        # conditional=True answers If-None-Match/If-Modified-Since with 304 and Range with 206.
+        # The WSGI server's file_wrapper sends the body with sendfile(), or the front server
+        # does when USE_X_SENDFILE is set.
+        response = send_from_directory(
+            root, served, mimetype=mimetype, conditional=True, etag=True, max_age=IMMUTABLE_MAX_AGE
+        )
+
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+def blob_path(digest, ext):
+    return os.path.join(media_root(), digest[:2], f'{digest}.{ext}')
+
+
+def blob_url(digest, ext):
+    return f'{MEDIA_URL_PREFIX}{digest[:2]}/{digest}.{ext}'
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+class UploadTooLarge(InvalidUpload):
+    pass
+
+
+def sniff_image(head):
+    """Return the file extension for an image's leading bytes, whatever the client called it."""
+    for magic, ext in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return ext
+    raise InvalidUpload('Only PNG, JPEG and GIF images are allowed')
+
+
+def copy_bounded(stream, out, max_size, on_chunk=None, sniff=False):
+    """Copy `stream` to `out` in CHUNK_SIZE pieces, failing as soon as it passes max_size.
+
+    With `sniff`, the magic bytes are checked as soon as they have arrived, so a
+    non-image is rejected without reading the rest of the body. Returns (bytes
+    copied, leading bytes).
+    """
+    size = 0
+    head = b''
+    sniffed = not sniff
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLarge(f'Upload exceeds {max_size} bytes')
+        if len(head) < SNIFF_SIZE:
+            head += chunk[:SNIFF_SIZE - len(head)]
+        if not sniffed and len(head) >= SNIFF_SIZE:
+            sniff_image(head)
+            sniffed = True
+        if on_chunk:
+            on_chunk(chunk)
+        out.write(chunk)
+    if not sniffed:  # shorter than SNIFF_SIZE
+        sniff_image(head)
+    return size, head
+
+
+def store_stream(stream, max_size=None):
+    """Hash `stream` while copying it to disk; keep one file per unique digest.
+
+    The type is taken from the magic bytes, the size is capped at max_size
+    (MAX_UPLOAD_SIZE by default). Returns (digest, size, ext). Memory use is
+    one chunk regardless of upload size.
+    """
+    root = media_root()
+    os.makedirs(root, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            size, head = copy_bounded(
+                stream, tmp, max_size or current_app.config['MAX_UPLOAD_SIZE'], digest.update, sniff=True
+            )
+        ext = sniff_image(head)
+        hexdigest = digest.hexdigest()
+        final_path = blob_path(hexdigest, ext)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return hexdigest, size, ext
+
+
+def _retain(digest, ext, size):
+    """Add a reference to the blob, creating its row; returns whether its variants exist."""
+    dialect = postgresql if db.session.get_bind().dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(MediaBlob).values(
+        digest=digest, ext=ext, size=size, ref_count=1, updated_at=datetime.utcnow()
+    )
+    return db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['digest'],
+        set_={'ref_count': MediaBlob.ref_count + 1, 'updated_at': datetime.utcnow()}
+    ).returning(MediaBlob.variants_ready)).scalar()
+
+
+def set_profile_picture(user, stream):
+    """Store an upload and point user.profile_pic at it, moving the blob references.
+
+    Returns the blob digest. Raises InvalidUpload before touching the user.
+    """
+    digest, size, ext = store_stream(stream)
+    url = blob_url(digest, ext)
+    if user.profile_pic == url:
+        return digest
+
+    variants_ready = _retain(digest, ext, size)
+    release_url(user.profile_pic)
+    user.profile_pic = url
+    user.profile_pic_variants = bool(variants_ready)
+    return digest
+
+
+def release_url(url):
+    match = MEDIA_URL_PATTERN.match(url or '')
+    if match:
+        db.session.execute(
+            update(MediaBlob)
+            .where(MediaBlob.digest == match.group(1))
+            .values(ref_count=MediaBlob.ref_count - 1, updated_at=datetime.utcnow())
+        )
+
+
+def recount_references():
+    """Recompute every ref_count from User.profile_pic (drift repair)."""
+    counts = {}
+    for (url,) in db.session.query(User.profile_pic).filter(User.profile_pic.like(MEDIA_URL_PREFIX + '%')):
+        match = MEDIA_URL_PATTERN.match(url)
+        if match:
+            counts[match.group(1)] = counts.get(match.group(1), 0) + 1
+    for blob in MediaBlob.query.all():
+        blob.ref_count = counts.get(blob.digest, 0)
+
+
+def collect_garbage(now=None):
+    """Delete unreferenced blobs and orphaned files older than the grace period."""
+    now = now or datetime.utcnow()
+    cutoff = now - GC_GRACE_PERIOD
+    removed = 0
+
+    doomed = MediaBlob.query.filter(MediaBlob.ref_count <= 0, MediaBlob.updated_at < cutoff).all()
+    for blob in doomed:
+        # Re-check in the DELETE so a blob re-referenced meanwhile survives
+        deleted = db.session.execute(
+            delete(MediaBlob).where(MediaBlob.digest == blob.digest, MediaBlob.ref_count <= 0)
+        ).rowcount
+        db.session.commit()
+        if deleted:
+            original = blob_path(blob.digest, blob.ext)
+            for path in glob.glob(VARIANT_PATTERN.format(original.rsplit('.', 1)[0], '*')) + [original]:
+                if os.path.exists(path):
+                    os.remove(path)
+                    removed += 1
+
+    # Files whose row never committed (failed request) or temp files from interrupted uploads
+    known = {digest for (digest,) in db.session.query(MediaBlob.digest)}
+    cutoff_ts = time.mktime(cutoff.timetuple())
+    for directory, _, files in os.walk(media_root()):
+        for name in files:
+            path = os.path.join(directory, name)
+            if name[:64] in known or os.path.getmtime(path) >= cutoff_ts:
+                continue
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def import_legacy_pictures():
+    """Move /static/profile_pics/<user>_<name> files into the blob store, deduplicating them.
+
+    Returns the set of imported digests.
+    """
+    legacy_root = os.path.join(current_app.root_path, 'static', 'profile_pics')
+    moved = set()
+    digests = set()
+    for user in User.query.filter(User.profile_pic.like('/static/profile_pics/%')).all():
+        name = os.path.basename(user.profile_pic)
+        path = os.path.join(legacy_root, name)
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'rb') as stream:
+                digests.add(set_profile_picture(user, stream))
+        except InvalidUpload:
+            continue
+        moved.add(path)
+    db.session.commit()
+
+    # Only now that every user points at the blob store can the originals go
+    for path in moved:
+        os.remove(path)
+    return digests
@@ -0,0 +1,39 @@
+"""Add media blob store
+
+Revision ID: 0d43593eb7a0
+Revises: 388228325c4e
+Create Date: 2025-08-12 10:41:07.318254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0d43593eb7a0'
+down_revision = '388228325c4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_blob',
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('ext', sa.String(length=10), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('digest')
+    )
+    with op.batch_alter_table('media_blob', schema=None) as batch_op:
+        batch_op.create_index('ix_media_blob_ref_count_updated_at', ['ref_count', 'updated_at'], unique=False)
+
+    # Existing static/profile_pics files are moved over by `flask import-legacy-media`
+
+
+def downgrade():
+    with op.batch_alter_table('media_blob', schema=None) as batch_op:
+        batch_op.drop_index('ix_media_blob_ref_count_updated_at')
+
+    op.drop_table('media_blob')
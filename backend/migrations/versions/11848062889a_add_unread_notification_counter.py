@@ -0,0 +1,38 @@
+"""Add unread notification counter
+
+Revision ID: 11848062889a
+Revises: c8181b2f9eac
+Create Date: 2025-08-08 09:47:35.120448
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '11848062889a'
+down_revision = 'c8181b2f9eac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unread_notifications', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_user_id_id', ['user_id', 'id'], unique=False)
+
+    op.execute(
+        'UPDATE "user" SET unread_notifications = ('
+        'SELECT COUNT(*) FROM notification '
+        'WHERE notification.user_id = "user".id AND coalesce(notification.is_read, false) = false)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_user_id_id')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('unread_notifications')
@@ -0,0 +1,61 @@
+"""Add full-text search indexes
+
+Revision ID: 22e9897daf3f
+Revises: 3a0eb50ad803
+Create Date: 2025-08-02 11:25:47.903116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '22e9897daf3f'
+down_revision = '3a0eb50ad803'
+branch_labels = None
+depends_on = None
+
+# Expressions must match fulltext.document_expression exactly for the planner to use them
+GIN_INDEXES = [
+    ('ix_artist_profile_fts', 'artist_profile', "coalesce(bio, '')"),
+    ('ix_user_fts', 'user', "coalesce(bio, '')"),
+    ('ix_announcement_fts', 'announcement', "(coalesce(title, '') || ' ') || coalesce(content, '')"),
+    ('ix_review_fts', 'review', "coalesce(comment, '')"),
+]
+
+SQLITE_SOURCES = [
+    ('artist', 'artist_profile', 'artist_id', 'artist_id', "coalesce(bio, '')"),
+    ('user', '"user"', 'id', 'NULL', "coalesce(bio, '')"),
+    ('announcement', 'announcement', 'id', 'artist_id', "coalesce(title, '') || ' ' || coalesce(content, '')"),
+    ('review', 'review', 'id', 'artist_id', "coalesce(comment, '')"),
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for name, table, expression in GIN_INDEXES:
+            op.create_index(
+                name, table,
+                [sa.text(f"to_tsvector('english'::regconfig, {expression})")],
+                postgresql_using='gin'
+            )
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, artist_id UNINDEXED, body, tokenize='porter unicode61')"
+        )
+        for kind, table, ref_id, artist_id, body in SQLITE_SOURCES:
+            op.execute(
+                f"INSERT INTO search_fts (kind, ref_id, artist_id, body) "
+                f"SELECT '{kind}', {ref_id}, {artist_id}, {body} FROM {table} WHERE trim({body}) != ''"
+            )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for name, table, _ in reversed(GIN_INDEXES):
+            op.drop_index(name, table_name=table)
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS search_fts")
@@ -0,0 +1,55 @@
+"""Add artist daily booking stats
+
+Revision ID: 23d3c9319eec
+Revises: 541980b251d4
+Create Date: 2025-08-14 10:05:31.418277
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '23d3c9319eec'
+down_revision = '541980b251d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('artist_daily_stats',
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('requested_count', sa.Integer(), nullable=False),
+    sa.Column('confirmed_count', sa.Integer(), nullable=False),
+    sa.Column('rejected_count', sa.Integer(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('booked_value', sa.Integer(), nullable=False),
+    sa.Column('paid_count', sa.Integer(), nullable=False),
+    sa.Column('paid_value', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('artist_id', 'day')
+    )
+
+    # New bookings used to be stored without a status; they were requests
+    op.execute("UPDATE booking SET status = 'requested' WHERE status IS NULL")
+
+    # Backfill; `flask rebuild-booking-stats` does the same for drift repair
+    op.execute(
+        "INSERT INTO artist_daily_stats (artist_id, day, requested_count, confirmed_count, rejected_count, "
+        "completed_count, booked_value, paid_count, paid_value) "
+        "SELECT artist_id, event_date, "
+        "SUM(CASE WHEN status = 'requested' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN status = 'confirmed' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN status IN ('confirmed', 'completed') THEN COALESCE(price, 0) ELSE 0 END), "
+        "SUM(CASE WHEN paid THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN paid THEN COALESCE(price, 0) ELSE 0 END) "
+        "FROM booking WHERE artist_id IS NOT NULL AND event_date IS NOT NULL "
+        "GROUP BY artist_id, event_date"
+    )
+
+
+def downgrade():
+    op.drop_table('artist_daily_stats')
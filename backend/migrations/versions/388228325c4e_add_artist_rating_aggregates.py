@@ -0,0 +1,52 @@
+"""Add artist rating aggregates
+
+Revision ID: 388228325c4e
+Revises: 11848062889a
+Create Date: 2025-08-11 14:20:53.662019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '388228325c4e'
+down_revision = '11848062889a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('artist_rating',
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('rating_avg', sa.Float(), nullable=False),
+    sa.Column('stars_1', sa.Integer(), nullable=False),
+    sa.Column('stars_2', sa.Integer(), nullable=False),
+    sa.Column('stars_3', sa.Integer(), nullable=False),
+    sa.Column('stars_4', sa.Integer(), nullable=False),
+    sa.Column('stars_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('artist_id')
+    )
+    with op.batch_alter_table('artist_rating', schema=None) as batch_op:
+        batch_op.create_index('ix_artist_rating_top_rated', ['rating_avg', 'rating_count'], unique=False)
+
+    # Backfill; `flask rebuild-ratings` does the same for drift repair
+    op.execute(
+        "INSERT INTO artist_rating (artist_id, rating_count, rating_sum, rating_avg, "
+        "stars_1, stars_2, stars_3, stars_4, stars_5) "
+        "SELECT artist_id, COUNT(*), SUM(rating), CAST(SUM(rating) AS FLOAT) / COUNT(*), "
+        "SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END), SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN rating = 3 THEN 1 ELSE 0 END), SUM(CASE WHEN rating = 4 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN rating = 5 THEN 1 ELSE 0 END) "
+        "FROM review GROUP BY artist_id"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('artist_rating', schema=None) as batch_op:
+        batch_op.drop_index('ix_artist_rating_top_rated')
+
+    op.drop_table('artist_rating')
@@ -0,0 +1,73 @@
+"""Add artist search fields
+
+Revision ID: 3a0eb50ad803
+Revises: 847911aac29c
+Create Date: 2025-07-28 16:40:02.517390
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a0eb50ad803'
+down_revision = '847911aac29c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('artist_genre',
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('genre', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['artist_profile.artist_id'], ),
+    sa.PrimaryKeyConstraint('artist_id', 'genre')
+    )
+    with op.batch_alter_table('artist_genre', schema=None) as batch_op:
+        batch_op.create_index('ix_artist_genre_genre', ['genre', 'artist_id'], unique=False)
+
+    with op.batch_alter_table('artist_profile', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('price', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_artist_profile_price'), ['price'], unique=False)
+
+    with op.batch_alter_table('availability', schema=None) as batch_op:
+        batch_op.create_index('ix_availability_date', ['date', 'is_available', 'artist_id'], unique=False)
+
+    # Backfill from the free-text columns; mirrors parse_genres/parse_price in models.py
+    connection = op.get_bind()
+    profiles = connection.execute(sa.text(
+        "SELECT artist_id, genres, pricing_info FROM artist_profile"
+    )).fetchall()
+    for artist_id, genres, pricing_info in profiles:
+        match = re.search(r'\d[\d,]*', pricing_info or '')
+        if match:
+            connection.execute(
+                sa.text("UPDATE artist_profile SET price = :price WHERE artist_id = :artist_id"),
+                {'price': int(match.group().replace(',', '')), 'artist_id': artist_id}
+            )
+        tags = []
+        for genre in (genres or '').split(','):
+            genre = genre.strip().lower()[:50]
+            if genre and genre not in tags:
+                tags.append(genre)
+        if tags:
+            connection.execute(
+                sa.text("INSERT INTO artist_genre (artist_id, genre) VALUES (:artist_id, :genre)"),
+                [{'artist_id': artist_id, 'genre': genre} for genre in tags]
+            )
+
+
+def downgrade():
+    with op.batch_alter_table('availability', schema=None) as batch_op:
+        batch_op.drop_index('ix_availability_date')
+
+    with op.batch_alter_table('artist_profile', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_artist_profile_price'))
+        batch_op.drop_column('price')
+
+    with op.batch_alter_table('artist_genre', schema=None) as batch_op:
+        batch_op.drop_index('ix_artist_genre_genre')
+
+    op.drop_table('artist_genre')
@@ -0,0 +1,39 @@
+"""Add resumable upload sessions
+
+Revision ID: 541980b251d4
+Revises: a823eaf39075
+Create Date: 2025-08-13 09:12:48.206733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '541980b251d4'
+down_revision = 'a823eaf39075'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_session',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('received', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('upload_session', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_upload_session_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_upload_session_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('upload_session', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_upload_session_user_id'))
+        batch_op.drop_index(batch_op.f('ix_upload_session_created_at'))
+
+    op.drop_table('upload_session')
@@ -0,0 +1,62 @@
+"""Add indexes for hot foreign keys
+
+Revision ID: 847911aac29c
+Revises: 68b530d3374e
+Create Date: 2025-07-25 10:12:41.208334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '847911aac29c'
+down_revision = '68b530d3374e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the newest row for each (artist_id, date) before enforcing uniqueness
+    op.execute(
+        "DELETE FROM availability WHERE id NOT IN "
+        "(SELECT MAX(id) FROM availability GROUP BY artist_id, date)"
+    )
+
+    with op.batch_alter_table('availability', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_availability_artist_id_date', ['artist_id', 'date'])
+
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_artist_id_event_date', ['artist_id', 'event_date', 'id'], unique=False)
+        batch_op.create_index('ix_booking_organizer_id_event_date', ['organizer_id', 'event_date', 'id'], unique=False)
+
+    with op.batch_alter_table('announcement', schema=None) as batch_op:
+        batch_op.create_index('ix_announcement_artist_id_created_at', ['artist_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_announcement_created_at', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.create_index('ix_review_artist_id', ['artist_id', 'id'], unique=False)
+        batch_op.create_index('ix_review_organizer_id', ['organizer_id', 'id'], unique=False)
+
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_user_id_created_at', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_user_id_created_at')
+
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.drop_index('ix_review_organizer_id')
+        batch_op.drop_index('ix_review_artist_id')
+
+    with op.batch_alter_table('announcement', schema=None) as batch_op:
+        batch_op.drop_index('ix_announcement_created_at')
+        batch_op.drop_index('ix_announcement_artist_id_created_at')
+
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_organizer_id_event_date')
+        batch_op.drop_index('ix_booking_artist_id_event_date')
+
+    with op.batch_alter_table('availability', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_availability_artist_id_date', type_='unique')
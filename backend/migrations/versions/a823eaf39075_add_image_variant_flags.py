@@ -0,0 +1,34 @@
+"""Add image variant flags
+
+Revision ID: a823eaf39075
+Revises: 0d43593eb7a0
+Create Date: 2025-08-12 16:05:32.914470
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a823eaf39075'
+down_revision = '0d43593eb7a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media_blob', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('variants_ready', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_pic_variants', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    # Existing blobs are rendered by `flask generate-variants`
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('profile_pic_variants')
+
+    with op.batch_alter_table('media_blob', schema=None) as batch_op:
+        batch_op.drop_column('variants_ready')
@@ -0,0 +1,32 @@
+"""Unique confirmed booking per artist and date
+
+Revision ID: c8181b2f9eac
+Revises: 22e9897daf3f
+Create Date: 2025-08-05 18:03:12.441870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8181b2f9eac'
+down_revision = '22e9897daf3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fails if an artist already has two confirmed bookings on one date; resolve those by hand first
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index(
+            'uq_booking_artist_id_event_date_confirmed', ['artist_id', 'event_date'],
+            unique=True,
+            postgresql_where=sa.text("status = 'confirmed'"),
+            sqlite_where=sa.text("status = 'confirmed'")
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('uq_booking_artist_id_event_date_confirmed')
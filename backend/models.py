@@ -1,7 +1,8 @@
+import re
 from extensions import db
 from datetime import datetime
 
-from werkzeug.security import generate_password_hash, check_password_hash
+from password_hashing import hash_password, password_needs_rehash, verify_password
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -11,18 +12,48 @@ class User(db.Model):
     role = db.Column(db.String(50), nullable=False)  # 'artist' or 'organizer'
     name = db.Column(db.String(120))
     profile_pic = db.Column(db.String, nullable=True)
+    profile_pic_variants = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     bio = db.Column(db.Text, nullable=True)
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     artist_profile = db.relationship('ArtistProfile', backref='user', uselist=False)
     availability = db.relationship('Availability', backref='user')
     bookings_as_artist = db.relationship('Booking', backref='artist', foreign_keys='Booking.artist_id')
     bookings_as_organizer = db.relationship('Booking', backref='organizer', foreign_keys='Booking.organizer_id')
+    announcements = db.relationship('Announcement', backref='artist')
+    reviews_received = db.relationship('Review', backref='artist', foreign_keys='Review.artist_id')
+    reviews_written = db.relationship('Review', backref='organizer', foreign_keys='Review.organizer_id')
+    rating = db.relationship('ArtistRating', uselist=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_needs_rehash(self.password_hash)
+
+    def picture_url(self, variant):
+        # Renditions live next to the original blob; see image_variants.py
+        if not self.profile_pic:
+            return None
+        if not self.profile_pic_variants:
+            return self.profile_pic
+        return self.profile_pic.rsplit('.', 1)[0] + f'_{variant}.jpg'
+
+def parse_genres(genres):
+    tags = []
+    for genre in (genres or '').split(','):
+        genre = genre.strip().lower()[:50]
+        if genre and genre not in tags:
+            tags.append(genre)
+    return tags
+
+def parse_price(pricing_info):
+    # First number in the free-text pricing, e.g. "₹1,500 per show" -> 1500
+    match = re.search(r'\d[\d,]*', pricing_info or '')
+    return int(match.group().replace(',', '')) if match else None
 
 class ArtistProfile(db.Model):
     artist_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
@@ -30,9 +61,17 @@ class ArtistProfile(db.Model):
     genres = db.Column(db.String(200))
     media_links = db.Column(db.Text)
     pricing_info = db.Column(db.String(200))
+    price = db.Column(db.Integer, index=True)
+
+    genre_tags = db.relationship('ArtistGenre', cascade='all, delete-orphan')
+
+    def sync_search_fields(self):
+        self.price = parse_price(self.pricing_info)
+        existing = {tag.genre: tag for tag in self.genre_tags}
+        self.genre_tags = [existing.get(g) or ArtistGenre(genre=g) for g in parse_genres(self.genres)]
 
     def serialize(self):
-        user = User.query.get(self.artist_id)
+        user = self.user
         return {
             "artist_id": self.artist_id,
             "bio": self.bio,
@@ -42,28 +81,58 @@ class ArtistProfile(db.Model):
             "name": user.username if user else "",
         }
 
+class ArtistGenre(db.Model):
+    __table_args__ = (
+        db.Index('ix_artist_genre_genre', 'genre', 'artist_id'),
+    )
+
+    artist_id = db.Column(db.Integer, db.ForeignKey('artist_profile.artist_id'), primary_key=True)
+    genre = db.Column(db.String(50), primary_key=True)
+
 
 
 
 
 
 class Availability(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('artist_id', 'date', name='uq_availability_artist_id_date'),
+        db.Index('ix_availability_date', 'date', 'is_available', 'artist_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     artist_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     date = db.Column(db.Date)
     is_available = db.Column(db.Boolean)
 
 class Booking(db.Model):
+    __table_args__ = (
+        db.Index('ix_booking_artist_id_event_date', 'artist_id', 'event_date', 'id'),
+        db.Index('ix_booking_organizer_id_event_date', 'organizer_id', 'event_date', 'id'),
+        # At most one confirmed booking per artist and date, enforced by the database
+        db.Index(
+            'uq_booking_artist_id_event_date_confirmed', 'artist_id', 'event_date',
+            unique=True,
+            postgresql_where=db.text("status = 'confirmed'"),
+            sqlite_where=db.text("status = 'confirmed'")
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     artist_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     organizer_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     event_date = db.Column(db.Date)
-    status = db.Column(db.String(50))  # requested, confirmed, rejected, completed
+    status = db.Column(db.String(50), default='requested')  # requested, confirmed, rejected, completed
     price = db.Column(db.Integer)
     message = db.Column(db.Text)
     paid = db.Column(db.Boolean, default=False)
 
 class Announcement(db.Model):
+    __table_args__ = (
+        db.Index('ix_announcement_artist_id_created_at', 'artist_id', 'created_at', 'id'),
+        db.Index('ix_announcement_created_at', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     artist_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     title = db.Column(db.String(200))
@@ -71,6 +140,11 @@ class Announcement(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Review(db.Model):
+    __table_args__ = (
+        db.Index('ix_review_artist_id', 'artist_id', 'id'),
+        db.Index('ix_review_organizer_id', 'organizer_id', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     artist_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     organizer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -78,7 +152,71 @@ class Review(db.Model):
     rating = db.Column(db.Integer, nullable=False)  # 1 to 5
     comment = db.Column(db.Text, nullable=True)
 
+class ArtistRating(db.Model):
+    # Maintained in the same transaction as each review; see ratings.py
+    __table_args__ = (
+        db.Index('ix_artist_rating_top_rated', 'rating_avg', 'rating_count'),
+    )
+
+    artist_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_avg = db.Column(db.Float, nullable=False, default=0)
+    stars_1 = db.Column(db.Integer, nullable=False, default=0)
+    stars_2 = db.Column(db.Integer, nullable=False, default=0)
+    stars_3 = db.Column(db.Integer, nullable=False, default=0)
+    stars_4 = db.Column(db.Integer, nullable=False, default=0)
+    stars_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    def serialize(self, histogram=False):
+        data = {
+            "average": round(self.rating_avg, 2),
+            "count": self.rating_count,
+        }
+        if histogram:
+            data["histogram"] = {str(s): getattr(self, f'stars_{s}') for s in range(1, 6)}
+        return data
+
+class ArtistDailyStats(db.Model):
+    # Per artist and event date, maintained on every booking flush; see booking_stats.py
+    artist_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    requested_count = db.Column(db.Integer, nullable=False, default=0)
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0)
+    rejected_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    booked_value = db.Column(db.Integer, nullable=False, default=0)  # price of confirmed + completed
+    paid_count = db.Column(db.Integer, nullable=False, default=0)
+    paid_value = db.Column(db.Integer, nullable=False, default=0)
+
+class MediaBlob(db.Model):
+    # One row per unique uploaded file; ref_count tracks User.profile_pic; see media_storage.py
+    __table_args__ = (
+        db.Index('ix_media_blob_ref_count_updated_at', 'ref_count', 'updated_at'),
+    )
+
+    digest = db.Column(db.String(64), primary_key=True)  # sha256 hex
+    ext = db.Column(db.String(10), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    variants_ready = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class UploadSession(db.Model):
+    # A resumable upload in progress; the bytes live in UPLOAD_ROOT, see resumable_uploads.py
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    size = db.Column(db.Integer, nullable=False)
+    received = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
 class Notification(db.Model):
+    __table_args__ = (
+        db.Index('ix_notification_user_id_created_at', 'user_id', 'created_at', 'id'),
+        db.Index('ix_notification_user_id_id', 'user_id', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     content = db.Column(db.String(300))
@@ -0,0 +1,59 @@
+from collections import Counter
+
+from sqlalchemy import bindparam, event, insert, update
+from sqlalchemy.orm import Session
+
+from broadcaster import broadcaster
+from extensions import db
+from models import Notification, User
+
+PENDING_KEY = 'pending_notifications'
+PUBLISH_KEY = 'published_notifications'
+
+RETURNED_COLUMNS = (Notification.id, Notification.user_id, Notification.content, Notification.created_at)
+
+
+def notification_event(row):
+    return {
+        'id': row.id,
+        'content': row.content,
+        'is_read': False,
+        'created_at': row.created_at.isoformat()
+    }
+
+
+def queue_notification(user_id, content):
+    """Queue a notification to be written by the session's next commit."""
+    db.session.info.setdefault(PENDING_KEY, []).append({'user_id': int(user_id), 'content': content})
+
+
+def _bump_unread_counters(session, user_ids):
+    counts = Counter(user_ids)
+    session.execute(
+        update(User.__table__)
+        .where(User.__table__.c.id == bindparam('user_id'))
+        .values(unread_notifications=User.__table__.c.unread_notifications + bindparam('count')),
+        [{'user_id': user_id, 'count': count} for user_id, count in counts.items()]
+    )
+
+
+@event.listens_for(Session, 'before_commit')
+def _write_pending_notifications(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        # One multi-row INSERT inside the transaction being committed
+        inserted = session.execute(insert(Notification).returning(*RETURNED_COLUMNS), pending).all()
+        _bump_unread_counters(session, [row['user_id'] for row in pending])
+        session.info.setdefault(PUBLISH_KEY, []).extend(inserted)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_notifications(session):
+    for row in session.info.pop(PUBLISH_KEY, None) or []:
+        broadcaster.publish(row.user_id, notification_event(row))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_notifications(session):
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop(PUBLISH_KEY, None)
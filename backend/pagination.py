@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import date, datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor(cursor)
+
+    decoded = []
+    for column, value in zip(columns, values):
+        if value is None and column.nullable:
+            decoded.append(None)
+            continue
+        python_type = column.type.python_type
+        try:
+            if python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            else:
+                value = python_type(value)
+        except (ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        decoded.append(value)
+    return decoded
+
+
+def page_args():
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE)), request.args.get('cursor')
+
+
+def keyset_paginate(query, sort_column, id_column, limit, cursor=None):
+    """Return one page of `query` ordered newest-first on (sort_column, id_column).
+
+    The cursor carries the sort key of the last row served, so every page is a
+    bounded index range scan no matter how deep the client has paged. Rows with
+    a NULL sort key come last on every backend, and the cursor can carry NULL.
+    """
+    columns = [sort_column, id_column] if sort_column is not None else [id_column]
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        if sort_column is not None:
+            last_sort, last_id = values
+            if last_sort is None:
+                query = query.filter(sort_column.is_(None), id_column < last_id)
+            else:
+                query = query.filter(or_(
+                    sort_column < last_sort,
+                    and_(sort_column == last_sort, id_column < last_id),
+                    sort_column.is_(None)
+                ))
+        else:
+            query = query.filter(id_column < values[0])
+
+    order = [id_column.desc()]
+    if sort_column is not None:
+        order.insert(0, sort_column.desc().nulls_last())
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingOverloaded(Exception):
+    """Every hashing slot is busy; the client should retry shortly."""
+
+
+class PasswordHasher:
+    """Runs the KDF on a small pool so login spikes cannot take over the request threads.
+
+    hashlib's scrypt/pbkdf2 release the GIL, so the pool gives real parallelism
+    up to `workers` cores and no more. At most `workers + queue_size` calls are
+    admitted; the rest fail fast with HashingOverloaded instead of queueing
+    without bound.
+    """
+
+    def __init__(self, method, workers=2, queue_size=16, timeout=5.0):
+        self.method = method
+        # Werkzeug writes shorthand methods out in full ("scrypt" -> "scrypt:32768:8:1"), so
+        # hash once to learn the prefix stored hashes will carry
+        self.prefix = generate_password_hash('', method).split('$', 1)[0]
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HashingOverloaded()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        # Werkzeug hashes look like "<method>$<salt>$<hash>", e.g. "scrypt:32768:8:1$..."
+        return pwhash.split('$', 1)[0] != self.prefix
+
+
+def init_password_hasher(app):
+    app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+    app.config.setdefault('PASSWORD_HASH_QUEUE', 16)
+    app.config.setdefault('PASSWORD_HASH_TIMEOUT', 5.0)
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_QUEUE'],
+        app.config['PASSWORD_HASH_TIMEOUT'],
+    )
+
+
+def _hasher():
+    if has_app_context():
+        return current_app.extensions.get('password_hasher')
+    return None
+
+
+def hash_password(password):
+    hasher = _hasher()
+    return hasher.hash(password) if hasher else generate_password_hash(password)
+
+
+def verify_password(pwhash, password):
+    hasher = _hasher()
+    return hasher.verify(pwhash, password) if hasher else check_password_hash(pwhash, password)
+
+
+def password_needs_rehash(pwhash):
+    hasher = _hasher()
+    return hasher.needs_rehash(pwhash) if hasher else False
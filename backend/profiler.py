@@ -0,0 +1,144 @@
+import hmac
+import os
+import random
+import re
+import sys
+import sysconfig
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app, g, request
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_NAME_PATTERN = re.compile(r'^[\w.-]+\.folded$')
+_LIBRARY_ROOTS = sorted({sysconfig.get_paths()[key] for key in ('purelib', 'platlib', 'stdlib')}, key=len, reverse=True)
+_APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _frame_label(code):
+    path = code.co_filename
+    for root in (_APP_ROOT,) + tuple(_LIBRARY_ROOTS):
+        if path.startswith(root + os.sep):
+            path = path[len(root) + 1:]
+            break
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'
+
+
+class Sampler:
+    """One background thread that periodically records the stack of every thread being profiled.
+
+    It only runs while at least one request is being profiled, so requests that
+    are not sampled pay nothing.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active = {}  # thread id -> Counter of folded stacks
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id):
+        stacks = Counter()
+        with self._lock:
+            self._active[thread_id] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return stacks
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._active.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            for thread_id, stacks in active.items():
+                frame = frames.get(thread_id)
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if labels:
+                    stacks[';'.join(reversed(labels))] += 1
+            time.sleep(self.interval)
+
+
+def profile_dir():
+    return current_app.config['PROFILE_DIR']
+
+
+def profile_token_ok(header_value):
+    token = current_app.config['PROFILE_TOKEN']
+    # compare_digest raises on non-ASCII str, and headers can carry any latin-1 text
+    return bool(token) and hmac.compare_digest(header_value.encode(), token.encode())
+
+
+def list_profiles():
+    names = [name for name in os.listdir(profile_dir()) if PROFILE_NAME_PATTERN.match(name)]
+    return sorted(names, reverse=True)
+
+
+def _prune(keep):
+    for name in list_profiles()[keep:]:
+        try:
+            os.remove(os.path.join(profile_dir(), name))
+        except FileNotFoundError:
+            pass
+
+
+def init_profiler(app):
+    """Register the profiling hooks, only when PROFILE_TOKEN or PROFILE_SAMPLE_RATE turns them on.
+
+    A request is profiled when it carries `X-Profile: <PROFILE_TOKEN>` or falls in
+    the PROFILE_SAMPLE_RATE fraction of traffic. Its stacks are written in the
+    folded format that flamegraph.pl and speedscope read.
+    """
+    app.config.setdefault('PROFILE_TOKEN', None)
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_INTERVAL_MS', 5)
+    app.config.setdefault('PROFILE_KEEP', 100)
+    app.config.setdefault('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'stagecraft-profiles'))
+    if not app.config['PROFILE_TOKEN'] and not app.config['PROFILE_SAMPLE_RATE']:
+        return
+    os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+    sampler = Sampler(app.config['PROFILE_INTERVAL_MS'] / 1000)
+    app.extensions['profiler'] = sampler
+
+    @app.before_request
+    def start_profile():
+        requested = PROFILE_HEADER in request.headers and profile_token_ok(request.headers[PROFILE_HEADER])
+        if not requested and random.random() >= app.config['PROFILE_SAMPLE_RATE']:
+            return
+        endpoint = (request.endpoint or 'unmatched').replace('.', '-')
+        g.profile_name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{request.method}-{endpoint}.folded"
+        g.profile_stacks = sampler.start(threading.get_ident())
+
+    @app.after_request
+    def name_profile(response):
+        if 'profile_name' in g:
+            response.headers['X-Profile-Id'] = g.profile_name
+        return response
+
+    @app.teardown_request
+    def save_profile(exc):
+        if 'profile_stacks' not in g:
+            return
+        stacks = sampler.stop(threading.get_ident())
+        path = os.path.join(app.config['PROFILE_DIR'], g.profile_name)
+        with open(path + '.part', 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        os.replace(path + '.part', path)
+        _prune(app.config['PROFILE_KEEP'])
@@ -0,0 +1,38 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def max_queries(limit):
+    """Declare the most SQL statements a view may run for a single request."""
+    def decorator(view):
+        view.max_queries = limit
+        return view
+    return decorator
+
+
+def init_query_budget(app):
+    app.config.setdefault('QUERY_BUDGET_ENFORCE', False)
+
+    @app.after_request
+    def check_query_budget(response):
+        if not app.config['QUERY_BUDGET_ENFORCE']:
+            return response
+        view = app.view_functions.get(request.endpoint)
+        limit = getattr(view, 'max_queries', None)
+        count = g.get('query_count', 0)
+        if limit is not None and count > limit:
+            raise QueryBudgetExceeded(
+                f"{request.endpoint} ran {count} queries (budget {limit})"
+            )
+        return response
@@ -0,0 +1,51 @@
+from sqlalchemy import Float, case, cast, delete, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import ArtistRating, Review
+
+EMPTY_RATING = {"average": None, "count": 0}
+
+
+def record_rating(artist_id, rating):
+    """Fold one new review into the artist's aggregates, atomically and without reading them."""
+    dialect = postgresql if db.session.get_bind().dialect.name == 'postgresql' else sqlite
+    stars = f'stars_{rating}'
+    histogram = {f'stars_{s}': int(s == rating) for s in range(1, 6)}
+    stmt = dialect.insert(ArtistRating).values(
+        artist_id=artist_id, rating_count=1, rating_sum=rating, rating_avg=float(rating), **histogram
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['artist_id'],
+        set_={
+            'rating_count': ArtistRating.rating_count + 1,
+            'rating_sum': ArtistRating.rating_sum + rating,
+            'rating_avg': cast(ArtistRating.rating_sum + rating, Float) / (ArtistRating.rating_count + 1),
+            stars: getattr(ArtistRating, stars) + 1,
+        }
+    )
+    db.session.execute(stmt)
+
+
+def rebuild_ratings(artist_ids=None):
+    """Recompute aggregates from the raw reviews with one INSERT ... SELECT."""
+    reviews = db.select(
+        Review.artist_id,
+        func.count(),
+        func.sum(Review.rating),
+        cast(func.sum(Review.rating), Float) / func.count(),
+        *[func.sum(case((Review.rating == s, 1), else_=0)) for s in range(1, 6)]
+    ).group_by(Review.artist_id)
+
+    clear = delete(ArtistRating)
+    if artist_ids is not None:
+        reviews = reviews.where(Review.artist_id.in_(artist_ids))
+        clear = clear.where(ArtistRating.artist_id.in_(artist_ids))
+
+    db.session.execute(clear)
+    result = db.session.execute(insert(ArtistRating).from_select(
+        ['artist_id', 'rating_count', 'rating_sum', 'rating_avg',
+         'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5'],
+        reviews
+    ))
+    return result.rowcount
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from db_routing import REPLICA_BIND
+from extensions import db
+
+INVALIDATE_KEY = 'invalidate_cache_tags'
+
+
+class MemoryCacheBackend:
+    """Per-process LRU with TTL."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._bumped = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires = item
+            if expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, ttl):
+        with self._lock:
+            self._entries[key] = (entry, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return {tag: self._versions.get(tag, 0) for tag in tags}
+
+    def bump(self, tags):
+        now = time.time()
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+                self._bumped[tag] = now
+
+    def recently_bumped(self, tags, seconds):
+        cutoff = time.time() - seconds
+        with self._lock:
+            return any(self._bumped.get(tag, 0) > cutoff for tag in tags)
+
+
+class SqliteCacheBackend:
+    """LRU with TTL in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, entry TEXT, "
+                "expires REAL, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS tags (tag TEXT PRIMARY KEY, version INTEGER, bumped REAL)")
+            if 'bumped' not in [row[1] for row in conn.execute("PRAGMA table_info(tags)")]:
+                conn.execute("ALTER TABLE tags ADD COLUMN bumped REAL")  # cache files from before bump times
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT entry, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        with conn:
+            if row[1] < now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        entry = json.loads(row[0])
+        entry['body'] = entry['body'].encode()
+        return entry
+
+    def set(self, key, entry, ttl):
+        now = time.time()
+        stored = dict(entry, body=entry['body'].decode())
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, entry, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(stored), now + ttl, now)
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed "
+                "LIMIT max(0, (SELECT COUNT(*) FROM entries) - ?))",
+                (self.max_entries,)
+            )
+
+    def tag_versions(self, tags):
+        if not tags:
+            return {}
+        rows = self._connect().execute(
+            f"SELECT tag, version FROM tags WHERE tag IN ({', '.join('?' * len(tags))})", list(tags)
+        ).fetchall()
+        versions = dict(rows)
+        return {tag: versions.get(tag, 0) for tag in tags}
+
+    def bump(self, tags):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO tags (tag, version, bumped) VALUES (?, 1, ?) "
+                "ON CONFLICT(tag) DO UPDATE SET version = version + 1, bumped = excluded.bumped",
+                [(tag, now) for tag in tags]
+            )
+
+    def recently_bumped(self, tags, seconds):
+        if not tags:
+            return False
+        row = self._connect().execute(
+            f"SELECT 1 FROM tags WHERE tag IN ({', '.join('?' * len(tags))}) AND bumped > ? LIMIT 1",
+            [*tags, time.time() - seconds]
+        ).fetchone()
+        return row is not None
+
+
+def init_response_cache(app):
+    app.config.setdefault('RESPONSE_CACHE_BACKEND', 'memory')
+    app.config.setdefault('RESPONSE_CACHE_TTL', 60)
+    app.config.setdefault('RESPONSE_CACHE_MAX_ENTRIES', 1024)
+    app.config.setdefault('RESPONSE_CACHE_PATH', '/tmp/stagecraft-response-cache.db')
+
+    backend = app.config['RESPONSE_CACHE_BACKEND']
+    if backend == 'memory':
+        app.extensions['response_cache'] = MemoryCacheBackend(app.config['RESPONSE_CACHE_MAX_ENTRIES'])
+    elif backend == 'sqlite':
+        app.extensions['response_cache'] = SqliteCacheBackend(
+            app.config['RESPONSE_CACHE_PATH'], app.config['RESPONSE_CACHE_MAX_ENTRIES']
+        )
+    elif backend != 'none':
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+
+
+def cached(tags, ttl=None):
+    """Serve a public GET view from the response cache.
+
+    `tags` maps the view's keyword arguments to the cache tags its response
+    depends on; invalidate_on_commit() with any of them expires the entry.
+
+    Invalidation assumes the miss that follows refills from data that already
+    has the commit. A replica_read view may be served by a replica that is still
+    behind, and caching that would pin the stale rows under the new version for
+    everyone. So a miss on a tag bumped within REPLICA_STICKY_SECONDS (how far
+    the replica is allowed to lag) reads from the primary instead.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None:
+                return view(*args, **kwargs)
+
+            key = request.path + '?' + '&'.join(sorted(
+                f'{k}={v}' for k, values in request.args.lists() for v in values
+            ))
+            entry_tags = tags(**kwargs)
+            # Read the versions before the view queries, so a write racing with it expires the entry
+            versions = cache.tag_versions(entry_tags)
+
+            entry = cache.get(key)
+            if entry is None or entry['tags'] != versions:
+                if REPLICA_BIND in db.engines and cache.recently_bumped(
+                        entry_tags, current_app.config['REPLICA_STICKY_SECONDS']):
+                    g.read_primary = True
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                entry = {
+                    'body': body,
+                    'etag': hashlib.sha256(body).hexdigest()[:32],
+                    'mimetype': response.mimetype,
+                    'tags': versions,
+                }
+                cache.set(key, entry, ttl or current_app.config['RESPONSE_CACHE_TTL'])
+
+            response = current_app.response_class(entry['body'], mimetype=entry['mimetype'])
+            response.set_etag(entry['etag'])
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def invalidate_on_commit(*tags):
+    db.session.info.setdefault(INVALIDATE_KEY, set()).update(tags)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    tags = session.info.pop(INVALIDATE_KEY, None)
+    if tags and has_app_context():
+        cache = current_app.extensions.get('response_cache')
+        if cache is not None:
+            cache.bump(tags)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidations(session):
+    session.info.pop(INVALIDATE_KEY, None)
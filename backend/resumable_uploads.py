@@ -0,0 +1,127 @@
+import os
+import re
+import secrets
+import tempfile
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, update
+
+from extensions import db
+from media_storage import CHUNK_SIZE, InvalidUpload, UploadTooLarge, copy_bounded, set_profile_picture
+from models import UploadSession
+
+# Sessions not finished within this long are dropped by `flask gc-media`
+UPLOAD_SESSION_TTL = timedelta(hours=24)
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class OffsetMismatch(InvalidUpload):
+    """The chunk does not start where the stored bytes end; the client should resume from `offset`."""
+
+    def __init__(self, offset):
+        super().__init__(f'Expected a chunk starting at byte {offset}')
+        self.offset = offset
+
+
+def upload_root():
+    return current_app.config.get('UPLOAD_ROOT') or os.path.join(current_app.root_path, 'uploads')
+
+
+def part_path(upload_id):
+    return os.path.join(upload_root(), f'{upload_id}.part')
+
+
+def parse_content_range(header):
+    """'bytes 0-1048575/5000000' -> (start, end exclusive, total)."""
+    match = CONTENT_RANGE_PATTERN.match(header or '')
+    if not match:
+        raise InvalidUpload('Content-Range must look like "bytes <start>-<end>/<total>"')
+    start, last, total = (int(group) for group in match.groups())
+    if last < start or last >= total:
+        raise InvalidUpload('Invalid Content-Range')
+    return start, last + 1, total
+
+
+def create_upload(user_id, size):
+    if size <= 0:
+        raise InvalidUpload('size must be positive')
+    if size > current_app.config['MAX_UPLOAD_SIZE']:
+        raise UploadTooLarge(f"Upload exceeds {current_app.config['MAX_UPLOAD_SIZE']} bytes")
+    upload = UploadSession(id=secrets.token_hex(16), user_id=user_id, size=size)
+    os.makedirs(upload_root(), exist_ok=True)
+    open(part_path(upload.id), 'wb').close()
+    db.session.add(upload)
+    return upload
+
+
+def receive_chunk(upload, stream, content_range):
+    """Append one chunk to the session's file and return the new offset.
+
+    The body is spooled to a temp file first, so the slow network read happens
+    outside the transaction; the claim on [start, end) is a conditional UPDATE,
+    which makes a duplicate or racing chunk fail with OffsetMismatch instead of
+    corrupting the file.
+    """
+    start, end, total = parse_content_range(content_range)
+    if total != upload.size:
+        raise InvalidUpload('Content-Range total does not match the upload size')
+    if start != upload.received:
+        raise OffsetMismatch(upload.received)
+    if end - start > current_app.config['UPLOAD_CHUNK_SIZE']:
+        raise UploadTooLarge(f"Chunks are limited to {current_app.config['UPLOAD_CHUNK_SIZE']} bytes")
+
+    with tempfile.TemporaryFile() as spool:
+        # The first chunk must start like an image; it is rejected as soon as its leading bytes arrive
+        size, head = copy_bounded(stream, spool, end - start, sniff=start == 0)
+        if size != end - start:
+            raise InvalidUpload('Chunk body does not match Content-Range')
+
+        claimed = db.session.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload.id, UploadSession.received == start)
+            .values(received=end)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            raise OffsetMismatch(db.session.get(UploadSession, upload.id).received)
+
+        spool.seek(0)
+        with open(part_path(upload.id), 'r+b') as part:
+            part.seek(start)
+            part.truncate()  # drop bytes left by a chunk whose transaction rolled back
+            for chunk in iter(lambda: spool.read(CHUNK_SIZE), b''):
+                part.write(chunk)
+        db.session.commit()
+    return end
+
+
+def finish_upload(upload, user):
+    """Move a fully received session into the blob store as the user's profile picture.
+
+    Returns the blob digest; call remove_part() once the transaction commits.
+    """
+    if upload.received != upload.size:
+        raise OffsetMismatch(upload.received)
+    with open(part_path(upload.id), 'rb') as stream:
+        digest = set_profile_picture(user, stream)
+    db.session.delete(upload)
+    return digest
+
+
+def remove_part(upload_id):
+    if os.path.exists(part_path(upload_id)):
+        os.remove(part_path(upload_id))
+
+
+def expire_uploads(now=None):
+    cutoff = (now or datetime.utcnow()) - UPLOAD_SESSION_TTL
+    expired = [upload_id for (upload_id,) in
+               db.session.query(UploadSession.id).filter(UploadSession.created_at < cutoff)]
+    if expired:
+        db.session.execute(delete(UploadSession).where(UploadSession.id.in_(expired)))
+        db.session.commit()
+    for upload_id in expired:
+        remove_part(upload_id)
+    return len(expired)
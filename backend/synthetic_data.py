@@ -0,0 +1,239 @@
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, func, insert, text
+
+from extensions import db
+from booking_stats import rebuild_booking_stats
+from fulltext import rebuild_index
+from models import (
+    Announcement, ArtistGenre, ArtistProfile, Availability, Booking, Notification, Review, User, parse_genres
+)
+from password_hashing import hash_password
+from ratings import rebuild_ratings
+
+# Roughly Zipf-shaped: a few genres are very common, most are niche
+GENRES = [
+    ('bollywood', 30), ('rock', 22), ('pop', 20), ('jazz', 12), ('classical', 10), ('hip hop', 9),
+    ('electronic', 8), ('folk', 7), ('sufi', 6), ('blues', 5), ('indie', 5), ('metal', 4),
+    ('carnatic', 4), ('hindustani', 4), ('reggae', 2), ('country', 2), ('funk', 2), ('ghazal', 2),
+]
+BOOKING_STATUSES = [('completed', 50), ('requested', 20), ('confirmed', 15), ('rejected', 15)]
+RATING_WEIGHTS = [4, 6, 15, 35, 40]  # 1..5 stars
+
+WORDS = (
+    'live acoustic wedding corporate festival band solo vocalist guitarist drummer keys duo trio '
+    'covers originals unplugged dance night lounge brunch concert sangeet club college tour studio '
+    'energetic soulful classic modern fusion retro requests setlist crowd venue stage'
+).split()
+
+# Every synthetic user can log in with this
+PASSWORD = 'password'
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _sentence(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + '.'
+
+
+class BulkWriter:
+    """Buffers rows per table and writes them as executemany Core INSERTs of `batch_size`."""
+
+    def __init__(self, batch_size, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, model, row):
+        table = model.__table__
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            # Buffered parents go first, or the child rows would reference missing keys
+            for parent in db.metadata.sorted_tables:
+                if parent is table:
+                    break
+                self._write(parent)
+            self._write(table)
+
+    def _write(self, table):
+        rows = self.buffers.get(table)
+        if not rows:
+            return
+        db.session.execute(insert(table), rows)
+        db.session.commit()
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+        self.buffers[table] = []
+        if self.progress:
+            self.progress(table.name, self.counts[table.name])
+
+    def flush(self):
+        # sorted_tables lists parents before children, so foreign keys hold
+        for table in db.metadata.sorted_tables:
+            self._write(table)
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _reset_sequences():
+    if db.session.get_bind().dialect.name != 'postgresql':
+        return
+    for model in (User, Availability, Booking, Review, Announcement, Notification):
+        name = model.__table__.name
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{name}\"', 'id'), "
+            f"(SELECT coalesce(max(id), 1) FROM \"{name}\"))"
+        ))
+    db.session.commit()
+
+
+def generate(users=1000, seed=42, start=date(2025, 1, 1), years=2, artist_share=0.3,
+             availability_density=0.3, bookings_per_organizer=10, notifications_per_user=10,
+             batch_size=5000, progress=None):
+    """Load a reproducible synthetic dataset with bulk Core INSERTs; returns rows per table.
+
+    The same seed and arguments always produce the same rows. Ids continue after
+    the existing ones, so it can be run on a database that already has data.
+    """
+    rng = random.Random(seed)
+    writer = BulkWriter(batch_size, progress)
+    days = years * 365
+    password_hash = hash_password(PASSWORD)  # one KDF call, not one per user
+
+    # Users
+    first_user_id = _next_id(User)
+    run = f'{seed}_{first_user_id}'
+    artist_ids, organizer_ids = [], []
+    for n in range(users):
+        user_id = first_user_id + n
+        role = 'artist' if rng.random() < artist_share else 'organizer'
+        (artist_ids if role == 'artist' else organizer_ids).append(user_id)
+        writer.add(User, {
+            'id': user_id,
+            'username': f'{role}_{run}_{n}',
+            'email': f'{role}_{run}_{n}@example.com',
+            'password_hash': password_hash,
+            'role': role,
+            'name': f'{role.title()} {n}',
+            'bio': _sentence(rng, 6, 20) if rng.random() < 0.6 else None,
+            'unread_notifications': 0,
+        })
+    writer.flush()
+
+    # Artist profiles, genres, availability and announcements
+    availability_id = _next_id(Availability)
+    announcement_id = _next_id(Announcement)
+    for artist_id in artist_ids:
+        genres = []
+        while len(genres) < rng.choice((1, 1, 2, 2, 3)):
+            genre = _weighted(rng, GENRES)
+            if genre not in genres:
+                genres.append(genre)
+        price = int(round(rng.lognormvariate(8.3, 0.8), -2)) or 100
+        writer.add(ArtistProfile, {
+            'artist_id': artist_id,
+            'bio': _sentence(rng, 10, 40),
+            'genres': ','.join(genres),
+            'media_links': f'https://example.com/{artist_id}',
+            'pricing_info': f'₹{price:,} per show',
+            'price': price,
+        })
+        for genre in parse_genres(','.join(genres)):
+            writer.add(ArtistGenre, {'artist_id': artist_id, 'genre': genre})
+
+        for day in rng.sample(range(days), int(days * availability_density)):
+            writer.add(Availability, {
+                'id': availability_id,
+                'artist_id': artist_id,
+                'date': start + timedelta(days=day),
+                'is_available': rng.random() < 0.8,
+            })
+            availability_id += 1
+
+        for _ in range(min(int(rng.expovariate(1 / 3)), 30)):
+            writer.add(Announcement, {
+                'id': announcement_id,
+                'artist_id': artist_id,
+                'title': _sentence(rng, 3, 7),
+                'content': _sentence(rng, 15, 60),
+                'created_at': datetime.combine(start, datetime.min.time()) + timedelta(minutes=rng.randrange(days * 1440)),
+            })
+            announcement_id += 1
+    writer.flush()
+
+    # Bookings across statuses, at most one confirmed per artist and date
+    booking_id = _next_id(Booking)
+    review_id = _next_id(Review)
+    confirmed = set()
+    for organizer_id in organizer_ids if artist_ids else []:
+        for _ in range(rng.randint(0, 2 * bookings_per_organizer)):
+            artist_id = rng.choice(artist_ids)
+            event_date = start + timedelta(days=rng.randrange(days))
+            status = _weighted(rng, BOOKING_STATUSES)
+            if status == 'confirmed':
+                if (artist_id, event_date) in confirmed:
+                    status = 'requested'
+                else:
+                    confirmed.add((artist_id, event_date))
+            writer.add(Booking, {
+                'id': booking_id,
+                'artist_id': artist_id,
+                'organizer_id': organizer_id,
+                'event_date': event_date,
+                'status': status,
+                'price': int(round(rng.lognormvariate(8.3, 0.8), -2)),
+                'message': _sentence(rng, 5, 25),
+                'paid': status == 'completed' and rng.random() < 0.7,
+            })
+            if status == 'completed' and rng.random() < 0.7:
+                writer.add(Review, {
+                    'id': review_id,
+                    'artist_id': artist_id,
+                    'organizer_id': organizer_id,
+                    'booking_id': booking_id,
+                    'rating': rng.choices(range(1, 6), RATING_WEIGHTS)[0],
+                    'comment': _sentence(rng, 4, 30) if rng.random() < 0.8 else None,
+                })
+                review_id += 1
+            booking_id += 1
+    writer.flush()
+
+    # Notifications, with unread counters that match them
+    notification_id = _next_id(Notification)
+    unread = {}
+    for user_id in artist_ids + organizer_ids:
+        for _ in range(rng.randint(0, 2 * notifications_per_user)):
+            is_read = rng.random() < 0.6
+            writer.add(Notification, {
+                'id': notification_id,
+                'user_id': user_id,
+                'content': _sentence(rng, 4, 12),
+                'is_read': is_read,
+                'created_at': datetime.combine(start, datetime.min.time()) + timedelta(minutes=rng.randrange(days * 1440)),
+            })
+            notification_id += 1
+            if not is_read:
+                unread[user_id] = unread.get(user_id, 0) + 1
+    writer.flush()
+    if unread:
+        db.session.execute(
+            User.__table__.update()
+            .where(User.__table__.c.id == bindparam('user_id'))
+            .values(unread_notifications=bindparam('count')),
+            [{'user_id': user_id, 'count': count} for user_id, count in unread.items()]
+        )
+
+    # Derived data the ORM hooks would have maintained row by row
+    rebuild_ratings(artist_ids)
+    rebuild_booking_stats(artist_ids)
+    rebuild_index()
+    db.session.commit()
+    _reset_sequences()
+    return writer.counts
@@ -23,6 +23,36 @@ function parseJwt(token) {
   }
 }
 
+// List endpoints return one page at a time plus a `next_cursor` for the page after it
+function withCursor(url, cursor) {
+  return cursor ? `${url}?cursor=${encodeURIComponent(cursor)}` : url;
+}
+
+function LoadMoreButton({ cursor, loading, onClick }) {
+  if (!cursor) return null;
+  return (
+    <button
+      type="button"
+      onClick={onClick}
+      disabled={loading}
+      className="mt-4 w-full bg-blue-100 text-blue-800 font-semibold px-4 py-2 rounded-lg hover:bg-blue-200 transition disabled:opacity-50"
+    >
+      {loading ? "Loading..." : "Load more"}
+    </button>
+  );
+}
+
+// The file goes as the raw request body rather than multipart form data, so the server
+// streams it to disk and can reject a non-image after its first bytes
+function uploadProfilePicture(file, token) {
+  return axios.post('http://localhost:5000/api/profile/picture', file, {
+    headers: {
+      'Content-Type': file.type.startsWith('image/') ? file.type : 'application/octet-stream',
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+}
+
 function MusicBackgroundUnified() {
   return (
     <div className="fixed inset-0 -z-10">
@@ -319,57 +349,19 @@ function Dashboard() {
     const payload = parseJwt(token);
     setUser(payload);
 
-    // Always fetch the latest profile for profile_pic_url
-    if (token && payload) {
-      const artistId = payload.sub?.id || payload.id || payload.sub;
-      fetch(`http://localhost:5000/api/artists/${artistId}`)
-        .then(res => res.json())
-        .then(data => {
-          if (data.artist) setProfilePicUrl(data.artist.profile_pic_url || null);
-        });
-    }
-
-    // Fetch notifications preview
+    // One round trip for everything the dashboard shows
     if (token) {
-      fetch("http://localhost:5000/notifications", {
+      fetch("http://localhost:5000/home", {
         headers: { "Authorization": `Bearer ${token}` }
       })
         .then(res => res.json())
-        .then(data => setNotifications(data.notifications?.slice(0, 3) || []));
-      // Fetch recent bookings
-      if (payload?.sub?.role === "artist" || payload?.role === "artist") {
-        fetch("http://localhost:5000/artist/bookings", {
-          headers: { "Authorization": `Bearer ${token}` }
-        })
-          .then(res => res.json())
-          .then(data => setRecentBookings(data.bookings?.slice(0, 3) || []));
-        // Fetch recent reviews for artist
-        fetch(`http://localhost:5000/reviews/artist/${payload?.sub?.id || payload?.id || payload?.sub}`, {
-          headers: { "Authorization": `Bearer ${token}` }
-        })
-          .then(res => res.json())
-          .then(data => setRecentReviews(data.reviews?.slice(0, 2) || []));
-        // Fetch recent announcements for artist
-        fetch("http://localhost:5000/announcements/my", {
-          headers: { "Authorization": `Bearer ${token}` }
-        })
-          .then(res => res.json())
-          .then(data => setRecentAnnouncements(data.announcements?.slice(0, 2) || []));
-      } else {
-        fetch("http://localhost:5000/organizer/bookings", {
-          headers: { "Authorization": `Bearer ${token}` }
-        })
-          .then(res => res.json())
-          .then(data => setRecentBookings(data.bookings?.slice(0, 3) || []));
-        // Fetch public announcements for organizer
-        fetch("http://localhost:5000/announcements")
-          .then(res => res.json())
-          .then(data => setRecentAnnouncements(data.announcements?.slice(0, 2) || []));
-        // Fetch reviews by organizer
-        fetch(`http://localhost:5000/reviews/organizer/${payload?.sub || payload?.id || payload?.sub}`)
-          .then(res => res.json())
-          .then(data => setRecentReviews(data.reviews?.slice(0, 2) || []));
-      }
+        .then(data => {
+          setProfilePicUrl(data.user?.profile_pic_url || null);
+          setNotifications(data.notifications || []);
+          setRecentBookings(data.bookings || []);
+          setRecentReviews(data.reviews || []);
+          setRecentAnnouncements(data.announcements || []);
+        });
     }
   }, []);
 
@@ -694,15 +686,8 @@ function ArtistProfile() {
     const token = localStorage.getItem('token');
     let newProfilePicUrl = profilePicUrl;
     if (selectedFile) {
-      const formData = new FormData();
-      formData.append('picture', selectedFile);
       try {
-        const res = await axios.post('http://localhost:5000/api/profile/picture', formData, {
-          headers: {
-            'Content-Type': 'multipart/form-data',
-            'Authorization': `Bearer ${token}`,
-          },
-        });
+        const res = await uploadProfilePicture(selectedFile, token);
         newProfilePicUrl = res.data.profile_pic_url;
         setProfilePicUrl(newProfilePicUrl);
         setPreview(newProfilePicUrl);
@@ -830,14 +815,7 @@ function ProfilePictureUpload({ currentPicUrl, onUploadSuccess }) {
     e.preventDefault();
     if (!selectedFile) return;
     const token = localStorage.getItem("token");
-    const formData = new FormData();
-    formData.append('picture', selectedFile);
-    const res = await axios.post('http://localhost:5000/api/profile/picture', formData, {
-      headers: {
-        'Content-Type': 'multipart/form-data',
-        'Authorization': `Bearer ${token}`,
-      },
-    });
+    const res = await uploadProfilePicture(selectedFile, token);
     onUploadSuccess(res.data.profile_pic_url);
   };
 
@@ -968,22 +946,30 @@ function ArtistAvailability() {
 function ArtistBookings() {
   const navigate = useNavigate();
   const [bookings, setBookings] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [success, setSuccess] = useState("");
   const [updatingId, setUpdatingId] = useState(null);
 
-  const fetchBookings = () => {
+  const fetchBookings = (cursor = null) => {
     const token = localStorage.getItem("token");
-    fetch("http://localhost:5000/artist/bookings", {
+    setLoadingMore(Boolean(cursor));
+    fetch(withCursor("http://localhost:5000/artist/bookings", cursor), {
       headers: { "Authorization": `Bearer ${token}` }
     })
       .then(res => res.json())
       .then(data => {
-        setBookings(data.bookings || []);
+        setBookings(prev => (cursor ? prev : []).concat(data.bookings || []));
+        setNextCursor(data.next_cursor || null);
         setLoading(false);
+        setLoadingMore(false);
       })
-      .catch(() => setLoading(false));
+      .catch(() => {
+        setLoading(false);
+        setLoadingMore(false);
+      });
   };
 
   useEffect(() => {
@@ -1007,7 +993,7 @@ function ArtistBookings() {
       const data = await res.json();
       if (res.ok) {
         setSuccess("Booking status updated!");
-        fetchBookings();
+        setBookings(prev => prev.map(b => (b.id === bookingId ? { ...b, status: newStatus } : b)));
       } else {
         setError(data.message || "Failed to update status");
       }
@@ -1067,6 +1053,7 @@ function ArtistBookings() {
               </div>
             ))}
           </div>
+          <LoadMoreButton cursor={nextCursor} loading={loadingMore} onClick={() => fetchBookings(nextCursor)} />
           <button onClick={() => navigate('/dashboard')} className="mt-8 text-blue-600 hover:underline">Back to Dashboard</button>
         </div>
       </GlassyCard>
@@ -1077,6 +1064,8 @@ function ArtistBookings() {
 function OrganizerBookings() {
   const navigate = useNavigate();
   const [bookings, setBookings] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [success, setSuccess] = useState("");
@@ -1091,17 +1080,23 @@ function OrganizerBookings() {
     { value: "completed", label: "Completed", color: "bg-purple-200 text-purple-800" },
   ];
 
-  const fetchBookings = () => {
+  const fetchBookings = (cursor = null) => {
     const token = localStorage.getItem("token");
-    fetch("http://localhost:5000/organizer/bookings", {
+    setLoadingMore(Boolean(cursor));
+    fetch(withCursor("http://localhost:5000/organizer/bookings", cursor), {
       headers: { "Authorization": `Bearer ${token}` }
     })
       .then(res => res.json())
       .then(data => {
-        setBookings(data.bookings || []);
+        setBookings(prev => (cursor ? prev : []).concat(data.bookings || []));
+        setNextCursor(data.next_cursor || null);
         setLoading(false);
+        setLoadingMore(false);
       })
-      .catch(() => setLoading(false));
+      .catch(() => {
+        setLoading(false);
+        setLoadingMore(false);
+      });
   };
 
   useEffect(() => {
@@ -1125,7 +1120,7 @@ function OrganizerBookings() {
       const data = await res.json();
       if (res.ok) {
         setSuccess("Booking status updated!");
-        fetchBookings();
+        setBookings(prev => prev.map(b => (b.id === bookingId ? { ...b, status: newStatus } : b)));
       } else {
         setError(data.message || "Failed to update status");
       }
@@ -1161,7 +1156,6 @@ function OrganizerBookings() {
       if (res.ok) {
         setSuccess("Review posted!");
         setReviewingId(null);
-        fetchBookings();
       } else {
         setError(data.message || "Failed to post review");
       }
@@ -1224,6 +1218,7 @@ function OrganizerBookings() {
               </div>
             ))}
           </div>
+          <LoadMoreButton cursor={nextCursor} loading={loadingMore} onClick={() => fetchBookings(nextCursor)} />
           <button onClick={() => navigate('/dashboard')} className="mt-8 text-blue-600 hover:underline">Back to Dashboard</button>
         </div>
       </GlassyCard>
@@ -1234,28 +1229,37 @@ function OrganizerBookings() {
 function ArtistReviews() {
   const navigate = useNavigate();
   const [reviews, setReviews] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
 
-  useEffect(() => {
-    const token = localStorage.getItem("token");
-    if (!token) {
-      navigate("/");
-      return;
-    }
+  const fetchReviews = (cursor = null) => {
     // Decode JWT to get artist id
-    const payload = parseJwt(token);
+    const payload = parseJwt(localStorage.getItem("token"));
     const artistId = payload?.sub || payload?.id || payload;
-    fetch(`http://localhost:5000/reviews/artist/${artistId}`)
+    setLoadingMore(Boolean(cursor));
+    fetch(withCursor(`http://localhost:5000/reviews/artist/${artistId}`, cursor))
       .then(res => res.json())
       .then(data => {
-        setReviews(data.reviews || []);
+        setReviews(prev => (cursor ? prev : []).concat(data.reviews || []));
+        setNextCursor(data.next_cursor || null);
         setLoading(false);
+        setLoadingMore(false);
       })
       .catch(() => {
         setError("Failed to load reviews");
         setLoading(false);
+        setLoadingMore(false);
       });
+  };
+
+  useEffect(() => {
+    if (!localStorage.getItem("token")) {
+      navigate("/");
+      return;
+    }
+    fetchReviews();
   }, [navigate]);
 
   if (loading) return <div className="flex items-center justify-center h-screen"><MusicBackgroundUnified /><GlassyCard>Loading...</GlassyCard></div>;
@@ -1276,6 +1280,7 @@ function ArtistReviews() {
             </li>
           ))}
         </ul>
+        <LoadMoreButton cursor={nextCursor} loading={loadingMore} onClick={() => fetchReviews(nextCursor)} />
         <button onClick={() => navigate('/dashboard')} className="mt-4 text-blue-600 hover:underline">Back to Dashboard</button>
       </GlassyCard>
     </div>
@@ -1432,20 +1437,30 @@ function ArtistAnnouncements() {
 function PublicAnnouncements() {
   const navigate = useNavigate();
   const [announcements, setAnnouncements] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
 
-  useEffect(() => {
-    fetch("http://localhost:5000/announcements")
+  const fetchAnnouncements = (cursor = null) => {
+    setLoadingMore(Boolean(cursor));
+    fetch(withCursor("http://localhost:5000/announcements", cursor))
       .then(res => res.json())
       .then(data => {
-        setAnnouncements(data.announcements || []);
+        setAnnouncements(prev => (cursor ? prev : []).concat(data.announcements || []));
+        setNextCursor(data.next_cursor || null);
         setLoading(false);
+        setLoadingMore(false);
       })
       .catch(() => {
         setError("Failed to load announcements");
         setLoading(false);
+        setLoadingMore(false);
       });
+  };
+
+  useEffect(() => {
+    fetchAnnouncements();
   }, []);
 
   if (loading) return <div className="flex items-center justify-center h-screen"><MusicBackgroundUnified /><GlassyCard>Loading...</GlassyCard></div>;
@@ -1466,6 +1481,7 @@ function PublicAnnouncements() {
             </li>
           ))}
         </ul>
+        <LoadMoreButton cursor={nextCursor} loading={loadingMore} onClick={() => fetchAnnouncements(nextCursor)} />
         <button onClick={() => navigate('/dashboard')} className="mt-4 text-blue-600 hover:underline">Back to Dashboard</button>
       </GlassyCard>
     </div>
@@ -1475,27 +1491,37 @@ function PublicAnnouncements() {
 function Notifications() {
   const navigate = useNavigate();
   const [notifications, setNotifications] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
 
-  useEffect(() => {
+  const fetchNotifications = (cursor = null) => {
     const token = localStorage.getItem("token");
-    if (!token) {
-      navigate("/");
-      return;
-    }
-    fetch("http://localhost:5000/notifications", {
+    setLoadingMore(Boolean(cursor));
+    fetch(withCursor("http://localhost:5000/notifications", cursor), {
       headers: { "Authorization": `Bearer ${token}` }
     })
       .then(res => res.json())
       .then(data => {
-        setNotifications(data.notifications || []);
+        setNotifications(prev => (cursor ? prev : []).concat(data.notifications || []));
+        setNextCursor(data.next_cursor || null);
         setLoading(false);
+        setLoadingMore(false);
       })
       .catch(() => {
         setError("Failed to load notifications");
         setLoading(false);
+        setLoadingMore(false);
       });
+  };
+
+  useEffect(() => {
+    if (!localStorage.getItem("token")) {
+      navigate("/");
+      return;
+    }
+    fetchNotifications();
   }, [navigate]);
 
   if (loading) return <div className="flex items-center justify-center h-screen"><MusicBackgroundUnified /><GlassyCard>Loading...</GlassyCard></div>;
@@ -1515,6 +1541,7 @@ function Notifications() {
             </li>
           ))}
         </ul>
+        <LoadMoreButton cursor={nextCursor} loading={loadingMore} onClick={() => fetchNotifications(nextCursor)} />
         <button onClick={() => navigate('/dashboard')} className="mt-4 text-blue-600 hover:underline">Back to Dashboard</button>
       </GlassyCard>
     </div>